@@ -2,10 +2,157 @@
 Gemini AI Integration module.
 """
 
-import google.generativeai as genai
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Union
+from config import (
+    INCIDENT_SEVERITIES, INCIDENT_STATUSES, THREAT_TYPES,
+    DATA_DEPARTMENTS, SENSITIVITY_LEVELS, QUALITY_SCORE_RANGE,
+    TICKET_PRIORITIES, TICKET_STATUSES, TICKET_CATEGORIES, TICKET_STAGES
+)
+
+
+# Fixed instruction prefix shared by every request, so the provider can reuse
+# its cached prefix and each call only pays for the variable tail
+SYSTEM_PREAMBLE = f"""You are the AI assistant built into the Intelligence Platform, a unified
+dashboard used by an organisation's Cybersecurity, Data Science and IT Operations teams.
+Users are analysts, engineers and executives. Answer questions about the platform's data,
+explain trends, and give concise, practical recommendations.
+
+The platform tracks three kinds of records:
+
+1. Cyber incidents - title, description, threat type, severity, status, created and
+   resolved timestamps, resolution time in hours, and the analyst assigned.
+   Threat types: {", ".join(THREAT_TYPES)}.
+   Severities (lowest to highest): {", ".join(INCIDENT_SEVERITIES)}.
+   Statuses: {", ".join(INCIDENT_STATUSES)}.
+
+2. Dataset metadata - name, source department, size in MB, row and column counts,
+   quality score, sensitivity, and last accessed time.
+   Departments: {", ".join(DATA_DEPARTMENTS)}.
+   Sensitivity levels: {", ".join(SENSITIVITY_LEVELS)}.
+   Quality scores range from {QUALITY_SCORE_RANGE[0]} to {QUALITY_SCORE_RANGE[1]}; below 5 needs attention,
+   8 or above is high quality.
+
+3. IT tickets - title, description, status, priority, category, workflow stage,
+   assignee, created and resolved timestamps, and hours spent in the current stage.
+   Priorities: {", ".join(TICKET_PRIORITIES)}.
+   Statuses: {", ".join(TICKET_STATUSES)}.
+   Categories: {", ".join(TICKET_CATEGORIES)}.
+   Stages: {", ".join(TICKET_STAGES)}.
+
+Requests may include a block of current platform data after the question. Base answers
+on that data when it is present and say so when it is not enough to answer. Prioritise
+critical and high severity items, open work, and low quality data. Use British English,
+short paragraphs and bullet points, and keep answers under 300 words unless asked for
+more detail. When asked for JSON, return only valid JSON with the requested keys."""
+
+
+# Model discovery filters: skip computer-use, 2.5 and non-2.0 experimental models
+EXCLUDED_MODEL_PATTERN = re.compile(r"computer|2\.5|^(?!.*2\.0).*exp", re.IGNORECASE)
+INCLUDED_MODEL_PATTERN = re.compile(r"gemini", re.IGNORECASE)
+# Errors meaning a model doesn't exist or needs special configuration
+SKIPPABLE_ERROR_PATTERN = re.compile(r"404|400|not found|not supported|v1beta|computer use", re.IGNORECASE)
+
+# Records per table quoted in the cross-department analysis prompt
+ANALYSIS_SAMPLE_ROWS = 5
+
+# Upper bound on simultaneous Gemini requests from one concurrent batch
+MAX_CONCURRENT_REQUESTS = 4
+
+# Exact-match response cache shared across reruns, keyed by (model_name, prompt).
+# Every session thread uses it, so all reads and writes hold the lock.
+RESPONSE_CACHE_SIZE = 512
+_response_cache: "OrderedDict[str, str]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _cache_key(model_name: str, prompt: str) -> str:
+    """Build a stable cache key for a model/prompt pair."""
+    return hashlib.blake2b((model_name + "\0" + prompt).encode("utf-8")).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_gemini_model(api_key: str) -> tuple:
+    """Discover and initialise a working Gemini model once per process.
+
+    Returns a (model, model_name, status) tuple.
+    """
+    # Imported here as the SDK pulls in gRPC/protobuf, which dominates cold start
+    import google.generativeai as genai
+    
+    try:
+        # Configure
+        genai.configure(api_key=api_key)
+        
+        # Try listing available models first - this ensures we only use models
+        # that are actually available for the current API version (v1beta)
+        models_to_try = []
+        try:
+            all_models = list(genai.list_models())
+            print(f"Found {len(all_models)} total models")
+            for m in all_models:
+                name = m.name.replace('models/', '')
+                # Allow 2.0 models (including experimental like 2.0-flash-exp which user said worked)
+                if EXCLUDED_MODEL_PATTERN.search(name) or not INCLUDED_MODEL_PATTERN.search(name):
+                    continue
+                
+                # Only add models that support generateContent
+                if 'generateContent' in m.supported_generation_methods:
+                    models_to_try.append(name)
+                    print(f"  Added model: {name}")
+        except Exception as e:
+            print(f"Could not list models: {e}")
+        
+        # Models from list_models() already advertise generateContent support
+        verified = bool(models_to_try)
+        
+        # Fallback models - try 2.0-flash variants first (user mentioned they worked), then gemini-pro
+        if not models_to_try:
+            print("No models found from list_models(), trying fallback models")
+            models_to_try = ["gemini-2.0-flash-exp", "gemini-2.0-flash", "gemini-pro"]
+        
+        if not models_to_try:
+            print("❌ No models to try")
+            return None, None, "❌ No compatible models found"
+        
+        # Try each model - only use models that actually work
+        print(f"Trying {len(models_to_try)} model(s): {models_to_try}")
+        for model_name in models_to_try:
+            try:
+                print(f"Attempting to initialize: {model_name}")
+                if not verified:
+                    # Metadata lookup confirms the model exists without a billed generation
+                    genai.get_model(f"models/{model_name}")
+                
+                # Use positional argument for the model name
+                model = genai.GenerativeModel(model_name, system_instruction=SYSTEM_PREAMBLE)
+                print(f"✅ Gemini initialized successfully: {model_name}")
+                return model, model_name, f"✅ Ready ({model_name})"
+            except Exception as e:
+                error_str = str(e)
+                # Skip models that don't exist (404) or require special config
+                if SKIPPABLE_ERROR_PATTERN.search(error_str):
+                    print(f"   ❌ {model_name}: Skipped - {error_str[:80]}")
+                    continue
+                # For other errors, still skip but log differently
+                print(f"   ⚠️ {model_name}: Error - {error_str[:80]}")
+                continue
+        
+        print("❌ Failed to initialize any Gemini model")
+        return None, None, "❌ Failed to initialize"
+        
+    except Exception as e:
+        print(f"❌ Initialization error: {e}")
+        return None, None, f"❌ Error: {str(e)[:50]}"
 
 
 class AIIntegration:
@@ -35,109 +182,141 @@ class AIIntegration:
             self.status = "❌ No API key"
             return
         
-        try:
-            # Configure
-            genai.configure(api_key=self.api_key)
-            
-            # Try listing available models first - this ensures we only use models
-            # that are actually available for the current API version (v1beta)
-            models_to_try = []
-            try:
-                all_models = genai.list_models()
-                print(f"Found {len(all_models)} total models")
-                for m in all_models:
-                    name = m.name.replace('models/', '')
-                    # Skip models that require computer use
-                    # Allow 2.0 models (including experimental like 2.0-flash-exp which user said worked)
-                    # Skip 2.5 and other experimental models that aren't 2.0
-                    if ('computer' in name.lower() or 
-                        ('exp' in name.lower() and '2.0' not in name) or 
-                        '2.5' in name):
-                        continue
-                    
-                    # Only add models that support generateContent
-                    if ('gemini' in name.lower() and 
-                        'generateContent' in m.supported_generation_methods):
-                        models_to_try.append(name)
-                        print(f"  Added model: {name}")
-            except Exception as e:
-                print(f"Could not list models: {e}")
-            
-            # Fallback models - try 2.0-flash variants first (user mentioned they worked), then gemini-pro
-            if not models_to_try:
-                print("No models found from list_models(), trying fallback models")
-                models_to_try = ["gemini-2.0-flash-exp", "gemini-2.0-flash", "gemini-pro"]
-            
-            if not models_to_try:
-                self.status = "❌ No compatible models found"
-                print("❌ No models to try")
-                return
-            
-            # Try each model - only use models that actually work
-            print(f"Trying {len(models_to_try)} model(s): {models_to_try}")
-            for model_name in models_to_try:
-                try:
-                    print(f"Attempting to initialize: {model_name}")
-                    # Use positional argument, not keyword
-                    self.model = genai.GenerativeModel(model_name)
-                    
-                    # Test with a simple call to verify it works
-                    test_response = self.model.generate_content("Hi")
-                    if test_response:
-                        self.model_name = model_name
-                        self.status = f"✅ Ready ({model_name})"
-                        print(f"✅ Gemini initialized successfully: {model_name}")
-                        return
-                except Exception as e:
-                    error_str = str(e)
-                    # Skip models that don't exist (404) or require special config
-                    if ("404" in error_str or 
-                        "not found" in error_str.lower() or
-                        "not supported" in error_str.lower() or
-                        "v1beta" in error_str.lower() or
-                        "computer use" in error_str.lower() or 
-                        "400" in error_str):
-                        print(f"   ❌ {model_name}: Skipped - {error_str[:80]}")
-                        continue
-                    # For other errors, still skip but log differently
-                    print(f"   ⚠️ {model_name}: Error - {error_str[:80]}")
-                    continue
-            
-            self.status = "❌ Failed to initialize"
-            print("❌ Failed to initialize any Gemini model")
-            
-        except Exception as e:
-            self.status = f"❌ Error: {str(e)[:50]}"
-            print(f"❌ Initialization error: {e}")
+        self.model, self.model_name, self.status = _load_gemini_model(self.api_key)
+        if not self.model:
+            # Don't keep a failed discovery cached, retry on the next rerun
+            _load_gemini_model.clear()
 
     def get_ai_status(self) -> str:
         """Get status."""
         return self.status
 
-    def chat_with_ai(self, user_message: str, stream: bool = False) -> str:
-        """Chat with AI."""
+    def _generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """Generate a response, serving repeated prompts from the cache."""
+        return self._generate_checked(prompt, generation_config)[0]
+
+    def _generate_checked(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> tuple:
+        """Generate a response as a (text, complete) pair, complete only when the model returned text."""
+        key = _cache_key(self.model_name or "", prompt)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached, True
+        
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+        text = self._extract_text(response)
+        if text is None:
+            # Blocked or empty responses are shown but never cached
+            return str(response), False
+        return self._store_response(key, text), True
+
+    @staticmethod
+    def _extract_text(response) -> Optional[str]:
+        """Get text from a Gemini response, or None when it has no text parts."""
+        # .text raises ValueError rather than AttributeError when there are no valid parts
+        try:
+            return response.text
+        except (AttributeError, ValueError):
+            pass
+        try:
+            return response.candidates[0].content.parts[0].text
+        except (AttributeError, IndexError):
+            return None
+
+    def _cached_response(self, key: str) -> Optional[str]:
+        """Get a cached response and mark it as recently used, or None on a miss."""
+        with _response_cache_lock:
+            text = _response_cache.get(key)
+            if text is not None:
+                _response_cache.move_to_end(key)
+            return text
+
+    def _discard_response(self, prompt: str):
+        """Remove a cached response, so an unusable reply is regenerated next time."""
+        with _response_cache_lock:
+            _response_cache.pop(_cache_key(self.model_name or "", prompt), None)
+
+    def _store_response(self, key: str, text: str) -> str:
+        """Add a response to the cache, evicting the least recently used entry."""
+        with _response_cache_lock:
+            _response_cache[key] = text
+            _response_cache.move_to_end(key)
+            if len(_response_cache) > RESPONSE_CACHE_SIZE:
+                _response_cache.popitem(last=False)
+        return text
+
+    def chat_with_ai(self, user_message: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        """Chat with AI, returning a chunk iterator when stream is True."""
+        if stream:
+            return self.chat_with_ai_stream(user_message)
+        
+        return self.chat_with_ai_checked(user_message)[0]
+
+    def chat_with_ai_checked(self, user_message: str) -> tuple:
+        """Chat with AI, returning (response, complete) where complete means a full text answer."""
         if not self.model:
-            return f"AI unavailable. Status: {self.status}"
+            return f"AI unavailable. Status: {self.status}", False
         
         try:
-            response = self.model.generate_content(user_message)
-            
-            # Get text from response
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text
-            else:
-                return str(response)
-                
+            return self._generate_checked(user_message)
+        except Exception as e:
+            return f"Error: {str(e)}", False
+
+    def chat_with_ai_stream(self, user_message: str, outcome: Optional[Dict[str, bool]] = None) -> Iterator[str]:
+        """Yield the AI response in chunks as they are generated.
+
+        When an outcome dict is given, outcome['complete'] is set once the stream ends,
+        True only if every chunk carried text and no error interrupted it.
+        """
+        if outcome is None:
+            outcome = {}
+        outcome['complete'] = False
+        
+        if not self.model:
+            yield f"AI unavailable. Status: {self.status}"
+            return
+        
+        key = _cache_key(self.model_name or "", user_message)
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield cached
+            outcome['complete'] = True
+            return
+        
+        chunks = []
+        complete = True
+        try:
+            for chunk in self.model.generate_content(user_message, stream=True):
+                text = self._extract_text(chunk)
+                if text is None:
+                    # Blocked or empty chunk, shown as-is and the response left uncached
+                    complete = False
+                    text = str(chunk)
+                chunks.append(text)
+                yield text
         except Exception as e:
-            return f"Error: {str(e)}"
+            yield f"Error: {str(e)}"
+            return
+        
+        if complete:
+            self._store_response(key, "".join(chunks))
+        outcome['complete'] = complete
+
+    def chat_with_ai_concurrent(self, user_messages: List[str]) -> List[str]:
+        """Send several independent prompts at once and return the responses in order."""
+        if len(user_messages) <= 1:
+            return [self.chat_with_ai(m) for m in user_messages]
+        
+        # Blocking calls on the shared sync client overlap on worker threads; unlike
+        # asyncio.run, this never binds the cached model to a short-lived event loop
+        with ThreadPoolExecutor(max_workers=min(len(user_messages), MAX_CONCURRENT_REQUESTS)) as executor:
+            return list(executor.map(self.chat_with_ai, user_messages))
 
     def analyse_incident_patterns(self, incidents: List[Dict[str, Any]]) -> str:
         """Analyse incidents."""
         if not self.model:
             # Fallback
             if incidents:
+                import pandas as pd
                 df = pd.DataFrame(incidents)
                 return f"Found {len(df)} incidents. Top threats: {df['threat_type'].value_counts().head(2).index.tolist() if 'threat_type' in df.columns else 'N/A'}"
             return "No incidents"
@@ -145,14 +324,7 @@ class AIIntegration:
         try:
             summary = "\n".join([f"{i.get('title', 'N/A')}: {i.get('severity', 'N/A')}" for i in incidents[:5]])
             prompt = f"Analyse these incidents:\n{summary}"
-            response = self.model.generate_content(prompt)
-            
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text
-            else:
-                return str(response)
+            return self._generate(prompt)
         except Exception as e:
             return f"Analysis error: {str(e)[:100]}"
 
@@ -161,6 +333,7 @@ class AIIntegration:
         if not self.model:
             # Fallback
             if datasets:
+                import pandas as pd
                 df = pd.DataFrame(datasets)
                 avg = df['quality_score'].mean() if 'quality_score' in df.columns else 0
                 return f"Found {len(df)} datasets. Avg quality: {avg:.1f}/10"
@@ -169,17 +342,46 @@ class AIIntegration:
         try:
             summary = "\n".join([f"{d.get('name', 'N/A')}: {d.get('quality_score', 'N/A')}/10" for d in datasets[:5]])
             prompt = f"Analyse data quality:\n{summary}"
-            response = self.model.generate_content(prompt)
-            
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text
-            else:
-                return str(response)
+            return self._generate(prompt)
         except Exception as e:
             return f"Analysis error: {str(e)[:100]}"
 
+    def analyse_all(self, incidents: List[Dict[str, Any]], datasets: List[Dict[str, Any]],
+                    tickets: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Analyse incidents, datasets and tickets in a single request."""
+        if not self.model:
+            # Fallback
+            open_tickets = len([t for t in tickets if t.get('status') == 'Open'])
+            return {
+                'cyber': self.analyse_incident_patterns(incidents),
+                'data': self.analyse_data_quality(datasets),
+                'it': f"Found {len(tickets)} tickets. Open: {open_tickets}" if tickets else "No tickets"
+            }
+        
+        try:
+            cyber = "\n".join([f"{i.get('title', 'N/A')}: {i.get('severity', 'N/A')}" for i in incidents[:ANALYSIS_SAMPLE_ROWS]])
+            data = "\n".join([f"{d.get('name', 'N/A')}: {d.get('quality_score', 'N/A')}/10" for d in datasets[:ANALYSIS_SAMPLE_ROWS]])
+            it = "\n".join([f"{t.get('title', 'N/A')}: {t.get('priority', 'N/A')} - {t.get('status', 'N/A')}" for t in tickets[:ANALYSIS_SAMPLE_ROWS]])
+            prompt = (
+                "Return JSON with string keys 'cyber', 'data' and 'it', each holding a short analysis.\n"
+                f"cyber (security incidents):\n{cyber or 'None'}\n"
+                f"data (dataset quality):\n{data or 'None'}\n"
+                f"it (IT tickets):\n{it or 'None'}"
+            )
+            reply = self._generate(prompt, {"response_mime_type": "application/json"})
+            try:
+                result = json.loads(reply)
+                if not isinstance(result, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError:
+                # Don't serve the malformed reply from the cache on the next click
+                self._discard_response(prompt)
+                raise
+            return {key: str(result.get(key, "No analysis returned")) for key in ('cyber', 'data', 'it')}
+        except Exception as e:
+            error = f"Analysis error: {str(e)[:100]}"
+            return {'cyber': error, 'data': error, 'it': error}
+
     def clear_history(self):
         """Clear history."""
         pass
@@ -0,0 +1,83 @@
+"""
+Semantic response cache for the AI Assistant.
+Reuses answers for rephrased questions when the dashboard data is unchanged.
+"""
+
+import hashlib
+import streamlit as st
+from typing import Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+SIMILARITY_THRESHOLD = 0.93
+
+
+@st.cache_resource(show_spinner=False)
+def _get_embedding_model():
+    """Load the sentence embedding model once per process."""
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+def context_hash(context: str) -> str:
+    """Hash the data context block a response was generated against."""
+    return hashlib.blake2b(context.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of AI responses stored in session state."""
+
+    def __init__(self, state_key: str = "ai_semantic_cache"):
+        """Initialise the cache backed by the given session state key."""
+        self.state_key = state_key
+        self.enabled = SEMANTIC_CACHE_AVAILABLE
+        if self.enabled and state_key not in st.session_state:
+            st.session_state[state_key] = {
+                'vectors': np.empty((0, EMBEDDING_DIM), dtype=np.float32),
+                'responses': [],
+                'context_hashes': []
+            }
+
+    def _embed(self, text: str):
+        """Return the L2-normalised embedding for a piece of text."""
+        vector = _get_embedding_model().encode([text], normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def lookup(self, question: str, ctx_hash: str) -> tuple[Optional[str], Optional["np.ndarray"]]:
+        """Return a cached response for a similar question, plus the query embedding."""
+        if not self.enabled:
+            return None, None
+
+        try:
+            query = self._embed(question)
+        except Exception as e:
+            print(f"Semantic cache disabled: {e}")
+            self.enabled = False
+            return None, None
+
+        store = st.session_state[self.state_key]
+        if not store['responses']:
+            return None, query
+
+        # Inner product of normalised vectors is the cosine similarity
+        scores = store['vectors'] @ query[0]
+        best = int(scores.argmax())
+        if scores[best] > SIMILARITY_THRESHOLD and store['context_hashes'][best] == ctx_hash:
+            return store['responses'][best], query
+        return None, query
+
+    def add(self, query, response: str, ctx_hash: str):
+        """Store a response against the embedding returned by lookup()."""
+        if not self.enabled or query is None:
+            return
+
+        store = st.session_state[self.state_key]
+        store['vectors'] = np.vstack([store['vectors'], query])
+        store['responses'].append(response)
+        store['context_hashes'].append(ctx_hash)
@@ -2,9 +2,9 @@
 Authentication module for the Intelligence Platform.
 """
 
-import bcrypt
 import streamlit as st
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
+from auth import passwords
 from database.db_manager import DatabaseManager
 
 class AuthenticationSystem:
@@ -13,16 +13,11 @@ class AuthenticationSystem:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
 
-    def hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+    def hash_password(self, password: str) -> bytes:
+        return passwords.hash_password(password)
 
-    def verify_password(self, password: str, hashed: str) -> bool:
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-        except Exception:
-            return False
+    def verify_password(self, password: str, hashed: Union[bytes, str]) -> bool:
+        return passwords.verify_password(password, hashed)
 
     def register_user(self, username: str, password: str, role: str) -> bool:
         try:
@@ -45,7 +40,14 @@ class AuthenticationSystem:
     def login_user(self, username: str, password: str) -> Optional[dict]:
         try:
             user = self.db.get_user(username)
-            if user and self.verify_password(password, user['password_hash']):
+            if not user:
+                return None
+            
+            if self.verify_password(password, user['password_hash']):
+                # Upgrade bcrypt hashes to argon2id now that we have the plaintext
+                if passwords.is_legacy_hash(user['password_hash']):
+                    user['password_hash'] = self.hash_password(password)
+                    self.db.update_user_password(username, user['password_hash'])
                 return user
             return None
         except Exception as e:
@@ -0,0 +1,40 @@
+"""
+Password hashing helpers shared by authentication and database seeding.
+"""
+
+from typing import Union
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from config import ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+
+_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM
+)
+
+
+def hash_password(password: str) -> bytes:
+    """Hash a password with argon2id."""
+    return _hasher.hash(password).encode('utf-8')
+
+
+def is_legacy_hash(hashed: Union[bytes, str]) -> bool:
+    """Check whether a stored hash predates argon2id and should be upgraded."""
+    if isinstance(hashed, bytes):
+        hashed = hashed.decode('utf-8')
+    return not hashed.startswith('$argon2')
+
+
+def verify_password(password: str, hashed: Union[bytes, str]) -> bool:
+    """Verify a password against an argon2id or legacy bcrypt hash."""
+    try:
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        if is_legacy_hash(hashed):
+            # Only needed for accounts that haven't logged in since the argon2id switch
+            import bcrypt
+            return bcrypt.checkpw(password.encode('utf-8'), hashed)
+        return _hasher.verify(hashed.decode('utf-8'), password)
+    except (VerificationError, InvalidHashError, ValueError):
+        return False
@@ -27,6 +27,11 @@ DEFAULT_THEME = "dark"
 # Database Configuration
 DATABASE_PATH = "intelligence_platform.db"
 
+# Password Hashing (argon2id, OWASP minimum: 19 MiB memory, 2 iterations)
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 19456
+ARGON2_PARALLELISM = 1
+
 # Default User Credentials
 DEFAULT_USERS = {
     "admin": {"password": "admin123", "role": "admin"},
@@ -49,6 +54,17 @@ CHART_COLOURS = {
 INCIDENT_SEVERITIES = ["Low", "Medium", "High", "Critical"]
 INCIDENT_STATUSES = ["Open", "In Progress", "Resolved"]
 THREAT_TYPES = ["Phishing", "Malware", "DDoS", "Brute Force", "Data Breach", "Insider Threat"]
+INCIDENT_SEVERITY_COLOURS = {
+    "Low": "#10b981",
+    "Medium": "#f59e0b",
+    "High": "#ef4444",
+    "Critical": "#dc2626"
+}
+INCIDENT_STATUS_COLOURS = {
+    "Open": "#ef4444",
+    "In Progress": "#f59e0b",
+    "Resolved": "#10b981"
+}
 
 # Dataset Configuration
 DATA_DEPARTMENTS = ["Sales", "Marketing", "Engineering", "Finance", "HR", "Operations"]
@@ -58,5 +74,11 @@ QUALITY_SCORE_RANGE = (1, 10)
 # IT Operations Configuration
 TICKET_PRIORITIES = ["Low", "Medium", "High", "Critical"]
 TICKET_STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+TICKET_STATUS_COLOURS = {
+    "Open": "#ef4444",
+    "In Progress": "#f59e0b",
+    "Resolved": "#10b981",
+    "Closed": "#6b7280"
+}
 TICKET_CATEGORIES = ["Hardware", "Software", "Network", "Security", "Database", "Other"]
 TICKET_STAGES = ["New", "Triaged", "In Progress", "Pending Review", "Resolved"]
\ No newline at end of file
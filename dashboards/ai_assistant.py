@@ -3,10 +3,61 @@ AI Assistant Dashboard module for intelligent chat and analysis.
 Provides AI-powered assistance across all platform functions.
 """
 
+import re
 import streamlit as st
 from ai.gemini_integration import AIIntegration
+from ai.semantic_cache import SemanticCache, context_hash
 from database.db_manager import DatabaseManager
 
+# Question intent patterns, matched on word starts so e.g. "security" doesn't hit "it".
+# Cross-department questions are matched on whole phrasings, so "overall data quality"
+# stays a data question.
+GENERAL_PATTERN = re.compile(
+    r"\b(system health|health summary|top priorities|overall recommendations|"
+    r"across (all )?departments|platform[- ]wide)\b",
+    re.IGNORECASE
+)
+CYBER_PATTERN = re.compile(r"\b(security|incident|threat|cyber|breach|malware|phishing)", re.IGNORECASE)
+DATA_PATTERN = re.compile(r"\b(data|dataset|quality|analytics|database)", re.IGNORECASE)
+IT_PATTERN = re.compile(r"\b(ticket|it\b|support|server|network|system)", re.IGNORECASE)
+ANALYSE_PATTERN = re.compile(r"\b(analy[sz]e|pattern)", re.IGNORECASE)
+
+# Quick question templates
+CYBER_QUESTIONS = [
+    "What are the most critical security incidents?",
+    "Which threat types are most common?",
+    "Analyse security incident patterns",
+    "What security recommendations do you have?",
+    "How many incidents are still open?",
+    "What's the average resolution time?"
+]
+DATA_QUESTIONS = [
+    "What's the overall data quality score?",
+    "Which datasets need improvement?",
+    "Analyse data quality trends",
+    "What data governance recommendations?",
+    "Which departments have best data quality?",
+    "What's the total data size?"
+]
+IT_QUESTIONS = [
+    "What IT tickets need attention?",
+    "What's the average ticket resolution time?",
+    "Analyse IT ticket patterns",
+    "Which categories have most tickets?",
+    "What IT recommendations do you have?",
+    "How many tickets are still open?"
+]
+GENERAL_QUESTIONS = [
+    "Give me a system health summary",
+    "What are the top priorities?",
+    "Any overall recommendations?"
+]
+
+@st.cache_data(max_entries=12, show_spinner=False)
+def _cached_context(_build, table_name, db_path, version):
+    """Build a data context block once per table version."""
+    return _build()
+
 class AIAssistantDashboard:
     """AI Assistant dashboard for intelligent chat and analysis."""
     
@@ -41,24 +92,11 @@ class AIAssistantDashboard:
         chat_container = st.container()
         with chat_container:
             for message in st.session_state.ai_chat_messages:
-                if message['role'] == 'user':
-                    st.markdown(f"""
-                    <div style='text-align: right; margin-bottom: 10px;'>
-                        <div class='user-message'>
-                            <strong>You:</strong><br>
-                            {message['content']}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div style='text-align: left; margin-bottom: 10px;'>
-                        <div class='ai-message'>
-                            <strong>AI Assistant:</strong><br>
-                            {message['content']}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                self._render_message(message)
+            
+            # Answer a question queued by a button or the chat form on the previous run
+            if st.session_state.ai_chat_messages and st.session_state.ai_chat_messages[-1]['role'] == 'pending':
+                self._answer_pending_question()
         
         # Get dashboard-specific questions based on user role
         user_role = st.session_state.get('user_role', 'admin')
@@ -74,108 +112,43 @@ class AIAssistantDashboard:
         if user_role in ["admin", "cybersecurity"]:
             st.markdown("#### 🛡️ Cybersecurity")
             cyber_cols = st.columns(3)
-            cyber_questions = [
-                "What are the most critical security incidents?",
-                "Which threat types are most common?",
-                "Analyse security incident patterns",
-                "What security recommendations do you have?",
-                "How many incidents are still open?",
-                "What's the average resolution time?"
-            ]
-            for idx, question in enumerate(cyber_questions):
+            for idx, question in enumerate(CYBER_QUESTIONS):
                 with cyber_cols[idx % 3]:
                     if st.button(question, key=f"cyber_{idx}", use_container_width=True):
                         # Auto-submit the question
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'user', 
-                            'content': question
-                        })
-                        with st.spinner("🤖 Thinking..."):
-                            response = self._get_ai_response_with_context(question)
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'assistant', 
-                            'content': response
-                        })
+                        self._queue_question(question)
                         st.rerun()
         
         # Data Science questions
         if user_role in ["admin", "data_science"]:
             st.markdown("#### 📊 Data Science")
             data_cols = st.columns(3)
-            data_questions = [
-                "What's the overall data quality score?",
-                "Which datasets need improvement?",
-                "Analyse data quality trends",
-                "What data governance recommendations?",
-                "Which departments have best data quality?",
-                "What's the total data size?"
-            ]
-            for idx, question in enumerate(data_questions):
+            for idx, question in enumerate(DATA_QUESTIONS):
                 with data_cols[idx % 3]:
                     if st.button(question, key=f"data_{idx}", use_container_width=True):
                         # Auto-submit the question
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'user', 
-                            'content': question
-                        })
-                        with st.spinner("🤖 Thinking..."):
-                            response = self._get_ai_response_with_context(question)
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'assistant', 
-                            'content': response
-                        })
+                        self._queue_question(question)
                         st.rerun()
         
         # IT Operations questions
         if user_role in ["admin", "it_operations"]:
             st.markdown("#### 💻 IT Operations")
             it_cols = st.columns(3)
-            it_questions = [
-                "What IT tickets need attention?",
-                "What's the average ticket resolution time?",
-                "Analyse IT ticket patterns",
-                "Which categories have most tickets?",
-                "What IT recommendations do you have?",
-                "How many tickets are still open?"
-            ]
-            for idx, question in enumerate(it_questions):
+            for idx, question in enumerate(IT_QUESTIONS):
                 with it_cols[idx % 3]:
                     if st.button(question, key=f"it_{idx}", use_container_width=True):
                         # Auto-submit the question
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'user', 
-                            'content': question
-                        })
-                        with st.spinner("🤖 Thinking..."):
-                            response = self._get_ai_response_with_context(question)
-                        st.session_state.ai_chat_messages.append({
-                            'role': 'assistant', 
-                            'content': response
-                        })
+                        self._queue_question(question)
                         st.rerun()
         
         # General questions
         st.markdown("#### 🌐 General")
         general_cols = st.columns(3)
-        general_questions = [
-            "Give me a system health summary",
-            "What are the top priorities?",
-            "Any overall recommendations?"
-        ]
-        for idx, question in enumerate(general_questions):
+        for idx, question in enumerate(GENERAL_QUESTIONS):
             with general_cols[idx % 3]:
                 if st.button(question, key=f"general_{idx}", use_container_width=True):
                     # Auto-submit the question
-                    st.session_state.ai_chat_messages.append({
-                        'role': 'user', 
-                        'content': question
-                    })
-                    with st.spinner("🤖 Thinking..."):
-                        response = self._get_ai_response_with_context(question)
-                    st.session_state.ai_chat_messages.append({
-                        'role': 'assistant', 
-                        'content': response
-                    })
+                    self._queue_question(question)
                     st.rerun()
         
         # Chat input
@@ -197,21 +170,8 @@ class AIAssistantDashboard:
         
         # Handle form submission
         if send_button and user_input:
-            # Add user message to chat history
-            st.session_state.ai_chat_messages.append({
-                'role': 'user', 
-                'content': user_input
-            })
-            
-            # Get AI response with dashboard data context
-            with st.spinner("🤖 Thinking..."):
-                response = self._get_ai_response_with_context(user_input)
-            
-            # Add AI response to chat history
-            st.session_state.ai_chat_messages.append({
-                'role': 'assistant', 
-                'content': response
-            })
+            # Queue the question, the AI response is streamed after the rerun
+            self._queue_question(user_input)
             
             # Clear selected question
             st.session_state.selected_question = ""
@@ -234,6 +194,48 @@ class AIAssistantDashboard:
             chat_length = len(st.session_state.ai_chat_messages)
             st.metric("Messages", chat_length)
 
+    def _render_message(self, message):
+        """Render a single chat message bubble."""
+        if message['role'] in ('user', 'pending'):
+            st.markdown(f"""
+            <div style='text-align: right; margin-bottom: 10px;'>
+                <div class='user-message'>
+                    <strong>You:</strong><br>
+                    {message['content']}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"""
+            <div style='text-align: left; margin-bottom: 10px;'>
+                <div class='ai-message'>
+                    <strong>AI Assistant:</strong><br>
+                    {message['content']}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    def _queue_question(self, question):
+        """Queue a question to be answered at the top of the next run."""
+        st.session_state.ai_chat_messages.append({'role': 'pending', 'content': question})
+    
+    def _answer_pending_question(self):
+        """Stream the AI response to the queued question into the conversation."""
+        pending = st.session_state.ai_chat_messages[-1]
+        pending['role'] = 'user'
+        
+        st.markdown("**AI Assistant:**")
+        response = self._get_ai_response_with_context(pending['content'], stream=True)
+        if isinstance(response, str):
+            st.markdown(response)
+        else:
+            response = st.write_stream(response)
+        
+        st.session_state.ai_chat_messages.append({
+            'role': 'assistant', 
+            'content': response
+        })
+    
     def _get_dashboard_questions(self, user_role):
         """Get dashboard-specific questions based on user role."""
         questions = {
@@ -248,87 +250,169 @@ class AIAssistantDashboard:
         }
         return questions.get(user_role, {})
     
-    def _get_ai_response_with_context(self, user_message):
-        """Get AI response with dashboard data context."""
+    def _get_ai_response_with_context(self, user_message, stream=False):
+        """Get AI response with dashboard data context, as a chunk iterator when streaming."""
         if not self.db_manager:
-            return self.ai_engine.chat_with_ai(user_message)
+            return self.ai_engine.chat_with_ai(user_message, stream=stream)
         
-        # Get relevant data based on question context
-        context = ""
+        # General summary questions fan out across all three departments
+        if GENERAL_PATTERN.search(user_message):
+            return self._get_general_summary(user_message)
         
-        # Check if question is about cybersecurity
-        if any(word in user_message.lower() for word in ['security', 'incident', 'threat', 'cyber', 'breach', 'malware', 'phishing']):
+        # Use appropriate AI method
+        analysis_type = self._get_analysis_type(user_message)
+        if analysis_type == 'cyber':
             incidents = self.db_manager.get_cyber_incidents()
-            if incidents:
-                context = f"\n\nCurrent Security Incidents Data:\n"
-                context += f"Total incidents: {len(incidents)}\n"
-                open_count = len([i for i in incidents if i.get('status') == 'Open'])
-                context += f"Open incidents: {open_count}\n"
-                critical_count = len([i for i in incidents if i.get('severity') == 'Critical'])
-                context += f"Critical incidents: {critical_count}\n"
-                # Get top threat types
-                from collections import Counter
-                threat_types = Counter([i.get('threat_type', 'Unknown') for i in incidents])
-                context += f"Top threat types: {', '.join([f'{k}({v})' for k, v in threat_types.most_common(3)])}\n"
-                # Include recent incidents
-                context += "\nRecent incidents:\n"
-                for inc in incidents[:5]:
-                    context += f"- {inc.get('title', 'N/A')}: {inc.get('severity', 'N/A')} - {inc.get('status', 'N/A')}\n"
-        
-        # Check if question is about data science
-        elif any(word in user_message.lower() for word in ['data', 'dataset', 'quality', 'analytics', 'database']):
+            return self.ai_engine.analyse_incident_patterns(incidents)
+        elif analysis_type == 'data':
             datasets = self.db_manager.get_all_datasets()
-            if datasets:
-                context = f"\n\nCurrent Datasets Data:\n"
-                context += f"Total datasets: {len(datasets)}\n"
-                import statistics
-                quality_scores = [d.get('quality_score', 0) for d in datasets if d.get('quality_score')]
-                if quality_scores:
-                    avg_quality = statistics.mean(quality_scores)
-                    context += f"Average quality score: {avg_quality:.1f}/10\n"
-                total_size = sum([d.get('size_mb', 0) for d in datasets])
-                context += f"Total data size: {total_size:.1f} MB\n"
-                # Get departments
-                from collections import Counter
-                departments = Counter([d.get('source_department', 'Unknown') for d in datasets])
-                context += f"Top departments: {', '.join([f'{k}({v})' for k, v in departments.most_common(3)])}\n"
-                # Include recent datasets
-                context += "\nRecent datasets:\n"
-                for ds in datasets[:5]:
-                    context += f"- {ds.get('name', 'N/A')}: Quality {ds.get('quality_score', 'N/A')}/10\n"
-        
-        # Check if question is about IT operations
-        elif any(word in user_message.lower() for word in ['ticket', 'it', 'support', 'server', 'network', 'system']):
-            tickets = self.db_manager.get_all_it_tickets()
-            if tickets:
-                context = f"\n\nCurrent IT Tickets Data:\n"
-                context += f"Total tickets: {len(tickets)}\n"
-                open_count = len([t for t in tickets if t.get('status') == 'Open'])
-                context += f"Open tickets: {open_count}\n"
-                # Get priorities
-                from collections import Counter
-                priorities = Counter([t.get('priority', 'Unknown') for t in tickets])
-                context += f"Priority distribution: {', '.join([f'{k}({v})' for k, v in priorities.most_common(3)])}\n"
-                categories = Counter([t.get('category', 'Unknown') for t in tickets])
-                context += f"Top categories: {', '.join([f'{k}({v})' for k, v in categories.most_common(3)])}\n"
-                # Include recent tickets
-                context += "\nRecent tickets:\n"
-                for ticket in tickets[:5]:
-                    context += f"- {ticket.get('title', 'N/A')}: {ticket.get('priority', 'N/A')} - {ticket.get('status', 'N/A')}\n"
-        
-        # Combine user message with context
+            return self.ai_engine.analyse_data_quality(datasets)
+        
+        # Combine user message with relevant data context
+        context = self._get_context(user_message)
         full_message = user_message + context
         
-        # Use appropriate AI method
-        if 'analyse' in user_message.lower() or 'pattern' in user_message.lower():
-            if 'incident' in user_message.lower() or 'security' in user_message.lower():
-                incidents = self.db_manager.get_cyber_incidents()
-                return self.ai_engine.analyse_incident_patterns(incidents)
-            elif 'data' in user_message.lower() or 'dataset' in user_message.lower():
-                datasets = self.db_manager.get_all_datasets()
-                return self.ai_engine.analyse_data_quality(datasets)
-        
-        return self.ai_engine.chat_with_ai(full_message)
+        # Reuse the answer to a similar question asked against the same data
+        semantic_cache = SemanticCache()
+        ctx_hash = context_hash(context)
+        cached_response, query_vector = semantic_cache.lookup(user_message, ctx_hash)
+        if cached_response is not None:
+            return cached_response
+        
+        if stream:
+            return self._stream_and_cache(full_message, semantic_cache, query_vector, ctx_hash)
+        
+        # Only complete text answers are cached; errors and blocked replies are shown once
+        response, complete = self.ai_engine.chat_with_ai_checked(full_message)
+        if complete:
+            semantic_cache.add(query_vector, response, ctx_hash)
+        return response
+    
+    def _stream_and_cache(self, full_message, semantic_cache, query_vector, ctx_hash):
+        """Yield response chunks, adding the completed response to the semantic cache."""
+        chunks = []
+        outcome = {}
+        for chunk in self.ai_engine.chat_with_ai_stream(full_message, outcome):
+            chunks.append(chunk)
+            yield chunk
+        
+        # A stream cut short by an error or a blocked chunk is not cached
+        if outcome.get('complete'):
+            semantic_cache.add(query_vector, "".join(chunks), ctx_hash)
+    
+    def _get_analysis_type(self, user_message):
+        """Return 'cyber' or 'data' when a question is answered by a dedicated analysis."""
+        if not ANALYSE_PATTERN.search(user_message):
+            return None
+        if CYBER_PATTERN.search(user_message):
+            return 'cyber'
+        if DATA_PATTERN.search(user_message):
+            return 'data'
+        return None
+    
+    def _get_context(self, user_message):
+        """Get the data context block relevant to a question."""
+        # Check cybersecurity first, so "data breach" stays a security question
+        if CYBER_PATTERN.search(user_message):
+            return self._get_cyber_context()
+        elif DATA_PATTERN.search(user_message):
+            return self._get_data_context()
+        elif IT_PATTERN.search(user_message):
+            return self._get_it_context()
+        return ""
+    
+    def _get_general_summary(self, user_message):
+        """Answer a cross-department question with one concurrent AI call per department."""
+        sections = [
+            ("🛡️ Cybersecurity", self._get_cyber_context()),
+            ("📊 Data Science", self._get_data_context()),
+            ("💻 IT Operations", self._get_it_context())
+        ]
+        sections = [(title, context) for title, context in sections if context]
+        if not sections:
+            return self.ai_engine.chat_with_ai(user_message)
+        
+        responses = self.ai_engine.chat_with_ai_concurrent(
+            [user_message + context for _, context in sections]
+        )
+        return "\n\n".join(
+            f"**{title}**\n\n{response}" for (title, _), response in zip(sections, responses)
+        )
+    
+    def _get_versioned_context(self, table_name, build):
+        """Get a context block, rebuilt only after the table has been written to."""
+        version = self.db_manager.get_table_version(table_name)
+        return _cached_context(build, table_name, self.db_manager.db_path, version)
+    
+    def _get_cyber_context(self):
+        """Get the security incidents context block."""
+        return self._get_versioned_context('cyber_incidents', self._build_cyber_context)
+    
+    def _get_data_context(self):
+        """Get the datasets context block."""
+        return self._get_versioned_context('datasets_metadata', self._build_data_context)
+    
+    def _get_it_context(self):
+        """Get the IT tickets context block."""
+        return self._get_versioned_context('it_tickets', self._build_it_context)
+    
+    def _format_counts(self, counts):
+        """Format (value, count) pairs as 'value(count)' items."""
+        return ', '.join(f'{k}({v})' for k, v in counts)
+    
+    def _format_recent(self, items, template):
+        """Format recent records as bullet lines using a str.format template."""
+        return "\n".join("- " + template.format_map(item) for item in items)
+    
+    def _build_cyber_context(self):
+        """Build the security incidents context block."""
+        summary = self.db_manager.cyber_summary()
+        if not summary['total']:
+            return ""
+        
+        recent = self._format_recent(summary['recent'], "{title}: {severity} - {status}")
+        return (
+            f"\n\nCurrent Security Incidents Data:\n"
+            f"Total incidents: {summary['total']}\n"
+            f"Open incidents: {summary['open_count']}\n"
+            f"Critical incidents: {summary['critical_count']}\n"
+            f"Top threat types: {self._format_counts(summary['top_threats'])}\n"
+            f"\nRecent incidents:\n{recent}\n"
+        )
+    
+    def _build_data_context(self):
+        """Build the datasets context block."""
+        summary = self.db_manager.dataset_summary()
+        if not summary['total']:
+            return ""
+        
+        avg_quality = summary['avg_quality']
+        quality_line = f"Average quality score: {avg_quality:.1f}/10\n" if avg_quality is not None else ""
+        recent = self._format_recent(summary['recent'], "{name}: Quality {quality_score}/10")
+        return (
+            f"\n\nCurrent Datasets Data:\n"
+            f"Total datasets: {summary['total']}\n"
+            f"{quality_line}"
+            f"Total data size: {summary['total_size']:.1f} MB\n"
+            f"Top departments: {self._format_counts(summary['top_departments'])}\n"
+            f"\nRecent datasets:\n{recent}\n"
+        )
+    
+    def _build_it_context(self):
+        """Build the IT tickets context block."""
+        summary = self.db_manager.ticket_summary()
+        if not summary['total']:
+            return ""
+        
+        recent = self._format_recent(summary['recent'], "{title}: {priority} - {status}")
+        return (
+            f"\n\nCurrent IT Tickets Data:\n"
+            f"Total tickets: {summary['total']}\n"
+            f"Open tickets: {summary['open_count']}\n"
+            f"Priority distribution: {self._format_counts(summary['top_priorities'])}\n"
+            f"Top categories: {self._format_counts(summary['top_categories'])}\n"
+            f"\nRecent tickets:\n{recent}\n"
+        )
     
     def _export_chat_history(self):
         """Export chat history as a text file."""
@@ -336,14 +420,11 @@ class AIAssistantDashboard:
             st.warning("No chat history to export.")
             return
         
-        chat_text = "Intelligence Platform - AI Assistant Chat History\n"
-        chat_text += "=" * 50 + "\n\n"
-        
-        for message in st.session_state.ai_chat_messages:
-            if message['role'] == 'user':
-                chat_text += f"You: {message['content']}\n\n"
-            else:
-                chat_text += f"AI Assistant: {message['content']}\n\n"
+        header = "Intelligence Platform - AI Assistant Chat History\n" + "=" * 50 + "\n\n"
+        chat_text = header + "".join(
+            f"{'You' if message['role'] == 'user' else 'AI Assistant'}: {message['content']}\n\n"
+            for message in st.session_state.ai_chat_messages
+        )
         
         # Create download link
         from datetime import datetime
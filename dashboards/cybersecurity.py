@@ -5,12 +5,80 @@ Provides threat monitoring, incident tracking, and security analytics.
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
-from config import INCIDENT_SEVERITIES, INCIDENT_STATUSES, THREAT_TYPES
+from itertools import islice
+from config import (INCIDENT_SEVERITIES, INCIDENT_STATUSES, THREAT_TYPES,
+                    INCIDENT_SEVERITY_COLOURS, INCIDENT_STATUS_COLOURS)
 from utils.search_filter import filter_cyber_incidents
 from utils.data_import import parse_csv_file, prepare_cyber_incident_data
+from utils.theme import render_metric_cards
+
+INCIDENTS_PER_PAGE = 20
+AREA_CHART_MAX_POINTS = 2000
+CATEGORICAL_COLUMNS = ('threat_type', 'severity', 'status')
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _load_incidents(_db, db_path, version):
+    """Fetch incidents and build their DataFrame once per table version."""
+    # Columnar fetch through Arrow when available, avoiding per-dict DataFrame construction
+    table = _db.get_cyber_incidents_arrow()
+    if table is not None:
+        incidents = table.to_pylist()
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+    else:
+        incidents = _db.get_cyber_incidents()
+        df = pd.DataFrame(incidents)
+    
+    # Low-cardinality labels are stored as int codes rather than Python strings
+    return incidents, df.astype({col: 'category' for col in CATEGORICAL_COLUMNS if col in df.columns})
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _incidents_csv(_df, db_path, version):
+    """Encode the incidents as CSV once per table version."""
+    return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _load_incident_aggregates(_db, db_path, version):
+    """Fetch grouped incident counts from the database and shape them for the charts."""
+    aggregates = _db.get_incident_aggregates()
+    # Plain-dict summary shared by the AI prompts
+    threat_rows = aggregates['threat_counts']
+    aggregates['summary'] = {
+        'threat': dict(threat_rows),
+        'severity': dict(aggregates['severity_counts']),
+        'status': dict(aggregates['status_counts']),
+        'avg_res': aggregates['avg_resolution_hours'],
+        'top_threat': threat_rows[0][0] if threat_rows else 'N/A'
+    }
+    for key in ('threat_counts', 'severity_counts', 'status_counts'):
+        aggregates[key] = pd.Series(dict(aggregates[key]), dtype='int64')
+    # Severity bars follow the configured Low -> Critical order
+    severities = aggregates['severity_counts']
+    aggregates['severity_counts'] = severities.reindex(
+        INCIDENT_SEVERITIES + [s for s in severities.index if s not in INCIDENT_SEVERITIES], fill_value=0
+    )
+    crosstab = pd.DataFrame(aggregates['threat_severity_crosstab'], columns=['threat_type', 'severity', 'count'])
+    aggregates['threat_severity_crosstab'] = crosstab.pivot(index='threat_type', columns='severity', values='count').fillna(0).astype(int)
+    # Scatter the (date, status, count) rows into a dense date x status matrix
+    daily_rows = aggregates['daily_status_counts']
+    days, statuses, counts = zip(*daily_rows) if daily_rows else ((), (), ())
+    date_codes, dates = pd.factorize(pd.to_datetime(list(days), format='%Y-%m-%d'), sort=True)
+    status_codes, statuses = pd.factorize(np.asarray(statuses, dtype=object), sort=True)
+    daily_counts = np.zeros((len(dates), len(statuses)), dtype=np.int64)
+    np.add.at(daily_counts, (date_codes, status_codes), np.asarray(counts, dtype=np.int64))
+    # Long histories are summed into weekly buckets so the stacked traces stay aligned
+    if len(dates) > AREA_CHART_MAX_POINTS:
+        week_codes, dates = pd.factorize(dates.to_period('W').start_time, sort=True)
+        weekly_counts = np.zeros((len(dates), len(statuses)), dtype=np.int64)
+        np.add.at(weekly_counts, week_codes, daily_counts)
+        daily_counts = weekly_counts
+    aggregates['daily_status_counts'] = (dates, statuses, daily_counts)
+    return aggregates
+
+def _reset_incidents_page():
+    """Return the incident list to its first page after a filter changes."""
+    st.session_state["incidents_page"] = 1
 
 class CyberSecurityDashboard:
     """Cybersecurity dashboard for incident management and threat analysis."""
@@ -24,43 +92,35 @@ class CyberSecurityDashboard:
         """Render the cybersecurity dashboard interface."""
         st.markdown("# 🛡️ Cybersecurity Dashboard")
         
-        # Fetch incident data
-        incidents_data = self.db.get_cyber_incidents()
+        # Fetch grouped counts from the database, reloaded only after the table has been written to
+        version = self.db.get_table_version('cyber_incidents')
+        aggregates = _load_incident_aggregates(self.db, self.db.db_path, version)
         
         # Load sample data if none exists
-        if not incidents_data:
+        if not aggregates['total_count']:
             st.info("No security incidents data available")
             if st.button("Load Sample Data"):
                 self._load_sample_cyber_data()
                 st.rerun()
             return
         
-        df = pd.DataFrame(incidents_data)
+        # Full rows are only needed for the export, scatter plot and incident list
+        incidents_data, df = _load_incidents(self.db, self.db.db_path, version)
         
         # Key Metrics Row
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"<div class='metric-card'><h3>Total Incidents</h3><h2 style='color: #6366f1;'>{len(df)}</h2></div>", unsafe_allow_html=True)
-        
-        with col2:
-            open_incidents = len(df[df['status'] == 'Open'])
-            st.markdown(f"<div class='metric-card'><h3>Open Incidents</h3><h2 style='color: #ef4444;'>{open_incidents}</h2></div>", unsafe_allow_html=True)
-        
-        with col3:
-            critical = len(df[df['severity'] == 'Critical'])
-            st.markdown(f"<div class='metric-card'><h3>Critical</h3><h2 style='color: #f59e0b;'>{critical}</h2></div>", unsafe_allow_html=True)
-        
-        with col4:
-            avg_res = df['resolution_time_hours'].mean() if 'resolution_time_hours' in df.columns and not df['resolution_time_hours'].isna().all() else 0
-            st.markdown(f"<div class='metric-card'><h3>Avg Resolution</h3><h2 style='color: #10b981;'>{avg_res:.1f}h</h2></div>", unsafe_allow_html=True)
+        render_metric_cards([
+            ("Total Incidents", aggregates['total_count'], "#6366f1"),
+            ("Open Incidents", aggregates['open_count'], "#ef4444"),
+            ("Critical", aggregates['critical_count'], "#f59e0b"),
+            ("Avg Resolution", f"{aggregates['avg_resolution_hours']:.1f}h", "#10b981")
+        ])
         
         st.markdown("---")
         
         # Export CSV button
         col1, col2 = st.columns([1, 5])
         with col1:
-            csv_data = df.to_csv(index=False)
+            csv_data = _incidents_csv(df, self.db.db_path, version)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             st.download_button(
                 label="📥 Export CSV",
@@ -72,103 +132,100 @@ class CyberSecurityDashboard:
         
         st.markdown("---")
         
-        # Dashboard Tabs
-        tab1, tab2, tab3, tab4 = st.tabs(["📊 Analytics", "🛡️ Incidents", "➕ Add Incident", "📥 Import Data"])
-        
-        with tab1:
-            self._show_cybersecurity_analytics(df)
-        
-        with tab2:
-            self._show_incidents_list(incidents_data)
+        # Dashboard sections; unlike st.tabs, only the selected one is executed on each rerun
+        section = st.radio(
+            "Section",
+            ["📊 Analytics", "🛡️ Incidents", "➕ Add Incident", "📥 Import Data"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="cyber_section"
+        )
         
-        with tab3:
+        if section == "📊 Analytics":
+            self._show_cybersecurity_analytics(df, aggregates, incidents_data)
+        elif section == "🛡️ Incidents":
+            self._show_incidents_list(incidents_data, aggregates['threat_counts'].index)
+        elif section == "➕ Add Incident":
             self._show_add_incident_form()
-        
-        with tab4:
+        else:
             self._show_import_data()
 
-    def _show_cybersecurity_analytics(self, df):
+    def _show_cybersecurity_analytics(self, df, aggregates, incidents_data):
         """Display cybersecurity analytics and charts."""
+        # Plotly is only needed here, so it is imported on first use of the analytics section
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
+        template = "plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
         col1, col2 = st.columns(2)
         
         with col1:
             # Interactive Threat Type Distribution with customization
-            if 'threat_type' in df.columns and not df.empty:
-                threat_counts = df['threat_type'].value_counts()
-                if not threat_counts.empty:
-                    # Chart customization options
-                    with st.expander("⚙️ Customise Chart", expanded=False):
-                        chart_type = st.radio("Chart Type", ["Pie", "Bar", "Donut"], horizontal=True, key="threat_chart_type")
-                        show_values = st.checkbox("Show Values", value=True, key="threat_show_values")
-                    
-                    if chart_type == "Pie":
-                        fig_pie = px.pie(
-                            values=threat_counts.values, 
-                            names=threat_counts.index, 
-                            title="Threat Type Distribution",
-                            color_discrete_sequence=px.colors.qualitative.Set3
-                        )
-                        if show_values:
-                            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                        fig_pie.update_layout(
-                            template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                            hovermode='closest'
-                        )
-                        st.plotly_chart(fig_pie, use_container_width=True)
-                    elif chart_type == "Donut":
-                        fig_donut = go.Figure(data=[go.Pie(
-                            labels=threat_counts.index,
-                            values=threat_counts.values,
-                            hole=0.4,
-                            textinfo='label+percent' if show_values else 'label'
-                        )])
-                        fig_donut.update_layout(
-                            title="Threat Type Distribution (Donut)",
-                            template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
-                        )
-                        st.plotly_chart(fig_donut, use_container_width=True)
-                    else:  # Bar
-                        fig_bar = px.bar(
-                            x=threat_counts.index,
-                            y=threat_counts.values,
-                            title="Threat Type Distribution",
-                            labels={'x': 'Threat Type', 'y': 'Count'},
-                            text=threat_counts.values if show_values else None
-                        )
-                        fig_bar.update_layout(
-                            template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                            xaxis_tickangle=-45
-                        )
-                        st.plotly_chart(fig_bar, use_container_width=True)
-                else:
-                    st.info("No threat type data available")
-            else:
-                st.info("No threat type data available")
-        
-        with col2:
-            # Severity Breakdown
-            if 'severity' in df.columns and not df.empty:
-                severity_counts = df['severity'].value_counts()
-                if not severity_counts.empty:
+            threat_counts = aggregates['threat_counts']
+            if not threat_counts.empty:
+                # Chart customization options
+                with st.expander("⚙️ Customise Chart", expanded=False):
+                    chart_type = st.radio("Chart Type", ["Pie", "Bar", "Donut"], horizontal=True, key="threat_chart_type")
+                    show_values = st.checkbox("Show Values", value=True, key="threat_show_values")
+                
+                if chart_type == "Pie":
+                    fig_pie = px.pie(
+                        values=threat_counts.values, 
+                        names=threat_counts.index, 
+                        title="Threat Type Distribution",
+                        color_discrete_sequence=px.colors.qualitative.Set3
+                    )
+                    if show_values:
+                        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+                    fig_pie.update_layout(
+                        template=template,
+                        hovermode='closest'
+                    )
+                    st.plotly_chart(fig_pie, use_container_width=True)
+                elif chart_type == "Donut":
+                    fig_donut = go.Figure(data=[go.Pie(
+                        labels=threat_counts.index,
+                        values=threat_counts.values,
+                        hole=0.4,
+                        textinfo='label+percent' if show_values else 'label'
+                    )])
+                    fig_donut.update_layout(
+                        title="Threat Type Distribution (Donut)",
+                        template=template
+                    )
+                    st.plotly_chart(fig_donut, use_container_width=True)
+                else:  # Bar
                     fig_bar = px.bar(
-                        x=severity_counts.index, 
-                        y=severity_counts.values,
-                        title="Severity Breakdown",
-                        color=severity_counts.index,
-                        color_discrete_map={
-                            'Low': '#10b981',
-                            'Medium': '#f59e0b',
-                            'High': '#ef4444',
-                            'Critical': '#dc2626'
-                        }
+                        x=threat_counts.index,
+                        y=threat_counts.values,
+                        title="Threat Type Distribution",
+                        labels={'x': 'Threat Type', 'y': 'Count'},
+                        text=threat_counts.values if show_values else None
                     )
                     fig_bar.update_layout(
-                        showlegend=False,
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
+                        template=template,
+                        xaxis_tickangle=-45
                     )
                     st.plotly_chart(fig_bar, use_container_width=True)
-                else:
-                    st.info("No severity data available")
+            else:
+                st.info("No threat type data available")
+        
+        with col2:
+            # Severity Breakdown
+            severity_counts = aggregates['severity_counts']
+            if not severity_counts.empty:
+                fig_bar = px.bar(
+                    x=severity_counts.index, 
+                    y=severity_counts.values,
+                    title="Severity Breakdown",
+                    color=severity_counts.index,
+                    color_discrete_map=INCIDENT_SEVERITY_COLOURS
+                )
+                fig_bar.update_layout(
+                    showlegend=False,
+                    template=template
+                )
+                st.plotly_chart(fig_bar, use_container_width=True)
             else:
                 st.info("No severity data available")
         
@@ -178,9 +235,9 @@ class CyberSecurityDashboard:
         
         with col3:
             # Threat Type vs Severity Heatmap
-            if 'threat_type' in df.columns and 'severity' in df.columns and not df.empty:
+            heatmap_data = aggregates['threat_severity_crosstab']
+            if not heatmap_data.empty:
                 try:
-                    heatmap_data = pd.crosstab(df['threat_type'], df['severity'])
                     fig_heatmap = go.Figure(data=go.Heatmap(
                         z=heatmap_data.values,
                         x=heatmap_data.columns,
@@ -194,7 +251,7 @@ class CyberSecurityDashboard:
                         title="Threat Type vs Severity Heatmap",
                         xaxis_title="Severity",
                         yaxis_title="Threat Type",
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
+                        template=template,
                         height=400
                     )
                     st.plotly_chart(fig_heatmap, use_container_width=True)
@@ -205,10 +262,11 @@ class CyberSecurityDashboard:
             # Resolution Time by Threat Type
             if 'threat_type' in df.columns and 'resolution_time_hours' in df.columns and not df.empty:
                 try:
-                    resolution_df = df[df['resolution_time_hours'].notna()]
-                    if not resolution_df.empty:
+                    # One pass over the raw array gives the mask for the resolved rows
+                    resolved = ~np.isnan(df['resolution_time_hours'].to_numpy(dtype=float, na_value=np.nan))
+                    if resolved.any():
                         fig_scatter = px.scatter(
-                            resolution_df,
+                            df[resolved],
                             x='threat_type',
                             y='resolution_time_hours',
                             color='severity',
@@ -218,7 +276,7 @@ class CyberSecurityDashboard:
                             hover_data=['title']
                         )
                         fig_scatter.update_layout(
-                            template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
+                            template=template,
                             height=400
                         )
                         st.plotly_chart(fig_scatter, use_container_width=True)
@@ -228,29 +286,25 @@ class CyberSecurityDashboard:
                     st.info("Could not create scatter plot")
         
         # Status Over Time Area Chart
-        if 'created_at' in df.columns and len(df) > 0:
+        dates, statuses, daily_counts = aggregates['daily_status_counts']
+        if len(dates):
             try:
-                df['created_at'] = pd.to_datetime(df['created_at'], format='ISO8601', errors='coerce')
-                df = df.dropna(subset=['created_at'])
-                df['date'] = df['created_at'].dt.date
-                daily_status = df.groupby(['date', 'status']).size().unstack(fill_value=0)
-                
                 fig_area = go.Figure()
-                for status in daily_status.columns:
+                for j, status in enumerate(statuses):
                     fig_area.add_trace(go.Scatter(
-                        x=daily_status.index,
-                        y=daily_status[status],
+                        x=dates,
+                        y=daily_counts[:, j],
                         mode='lines',
                         name=status,
                         stackgroup='one',
-                        fill='tonexty' if status != daily_status.columns[0] else 'tozeroy'
+                        fill='tonexty' if j else 'tozeroy'
                     ))
                 
                 fig_area.update_layout(
                     title="Incident Status Over Time (Area Chart)",
                     xaxis_title="Date",
                     yaxis_title="Number of Incidents",
-                    template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
+                    template=template,
                     height=400
                 )
                 st.plotly_chart(fig_area, use_container_width=True)
@@ -261,13 +315,14 @@ class CyberSecurityDashboard:
         st.markdown("---")
         st.markdown("### 🤖 AI-Powered Analytics")
         
+        summary = aggregates['summary']
         ai_col1, ai_col2, ai_col3 = st.columns(3)
         
         with ai_col1:
             if st.button("📊 Analyse Patterns", key="analyse_patterns", use_container_width=True):
                 with st.spinner("🤖 AI is analysing incident patterns..."):
                     if self.ai_engine and hasattr(self.ai_engine, 'analyse_incident_patterns'):
-                        analysis = self.ai_engine.analyse_incident_patterns(df.to_dict('records'))
+                        analysis = self.ai_engine.analyse_incident_patterns(incidents_data)
                         st.markdown("#### Analysis Results")
                         st.markdown(analysis)
                     else:
@@ -278,17 +333,17 @@ class CyberSecurityDashboard:
                 with st.spinner("🤖 AI is predicting future trends..."):
                     if self.ai_engine and self.ai_engine.model:
                         try:
-                            prompt = f"""Based on these {len(df)} security incidents, predict:
+                            prompt = f"""Based on these {aggregates['total_count']} security incidents, predict:
 1. Likely future threat types
 2. Expected incident volume trends
 3. Areas requiring immediate attention
 4. Risk assessment for next 30 days
 
 Incident summary:
-- Threat types: {df['threat_type'].value_counts().to_dict()}
-- Severity distribution: {df['severity'].value_counts().to_dict()}
-- Status: {df['status'].value_counts().to_dict()}
-- Average resolution: {df['resolution_time_hours'].mean():.1f} hours
+- Threat types: {summary['threat']}
+- Severity distribution: {summary['severity']}
+- Status: {summary['status']}
+- Average resolution: {summary['avg_res']:.1f} hours
 
 Provide actionable predictions and recommendations."""
                             prediction = self.ai_engine.chat_with_ai(prompt)
@@ -304,13 +359,11 @@ Provide actionable predictions and recommendations."""
                 with st.spinner("🤖 AI is generating recommendations..."):
                     if self.ai_engine and self.ai_engine.model:
                         try:
-                            critical_count = len(df[df['severity'] == 'Critical'])
-                            open_count = len(df[df['status'] == 'Open'])
                             prompt = f"""Provide specific, actionable security recommendations based on:
-- {critical_count} critical incidents
-- {open_count} open incidents
-- Top threat: {df['threat_type'].mode()[0] if not df.empty else 'N/A'}
-- Average resolution time: {df['resolution_time_hours'].mean():.1f} hours
+- {aggregates['critical_count']} critical incidents
+- {aggregates['open_count']} open incidents
+- Top threat: {summary['top_threat']}
+- Average resolution time: {summary['avg_res']:.1f} hours
 
 Focus on immediate actions and long-term improvements."""
                             recommendations = self.ai_engine.chat_with_ai(prompt)
@@ -321,7 +374,7 @@ Focus on immediate actions and long-term improvements."""
                     else:
                         st.info("AI engine not available.")
 
-    def _show_incidents_list(self, incidents_data):
+    def _show_incidents_list(self, incidents_data, threat_types):
         """Display list of recent security incidents."""
         st.markdown("### Recent Security Incidents")
         
@@ -330,25 +383,24 @@ Focus on immediate actions and long-term improvements."""
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                search_term = st.text_input("🔎 Search", placeholder="Title, description, threat type...", key="search_incidents")
+                search_term = st.text_input("🔎 Search", placeholder="Title, description, threat type...", key="search_incidents", on_change=_reset_incidents_page)
             
             with col2:
-                threat_types_list = list(set([inc.get('threat_type', '') for inc in incidents_data if inc.get('threat_type')]))
-                threat_types = ["All"] + sorted(threat_types_list) if threat_types_list else ["All"]
-                filter_threat = st.selectbox("Threat Type", threat_types, key="filter_threat")
+                # Distinct threat types come from the cached grouped counts
+                filter_threat = st.selectbox("Threat Type", ["All"] + sorted(t for t in threat_types if t), key="filter_threat", on_change=_reset_incidents_page)
             
             with col3:
-                filter_status = st.selectbox("Status", ["All"] + INCIDENT_STATUSES, key="filter_status")
+                filter_status = st.selectbox("Status", ["All"] + INCIDENT_STATUSES, key="filter_status", on_change=_reset_incidents_page)
             
             with col4:
-                filter_severity = st.selectbox("Severity", ["All"] + INCIDENT_SEVERITIES, key="filter_severity")
+                filter_severity = st.selectbox("Severity", ["All"] + INCIDENT_SEVERITIES, key="filter_severity", on_change=_reset_incidents_page)
             
             # Date range filter
             col5, col6 = st.columns(2)
             with col5:
-                date_from = st.date_input("From Date", value=None, key="date_from")
+                date_from = st.date_input("From Date", value=None, key="date_from", on_change=_reset_incidents_page)
             with col6:
-                date_to = st.date_input("To Date", value=None, key="date_to")
+                date_to = st.date_input("To Date", value=None, key="date_to", on_change=_reset_incidents_page)
         
         # Apply filters using utility function
         date_range = None
@@ -356,8 +408,7 @@ Focus on immediate actions and long-term improvements."""
             date_range = (datetime.combine(date_from, datetime.min.time()), 
                          datetime.combine(date_to, datetime.max.time()))
         
-        filtered_incidents = filter_cyber_incidents(
-            incidents_data,
+        filter_kwargs = dict(
             search_term=search_term,
             threat_type=filter_threat,
             severity=filter_severity,
@@ -365,66 +416,105 @@ Focus on immediate actions and long-term improvements."""
             date_range=date_range
         )
         
-        # Show results count
-        st.info(f"Showing {len(filtered_incidents)} of {len(incidents_data)} incidents")
+        # Only filter as far as the requested page, plus one row to tell whether another follows
+        page = st.session_state.get("incidents_page", 1)
+        offset = (page - 1) * INCIDENTS_PER_PAGE
+        page_incidents = list(islice(filter_cyber_incidents(incidents_data, **filter_kwargs),
+                                     offset, offset + INCIDENTS_PER_PAGE + 1))
+        
+        # A page past the end (e.g. after a delete) falls back to the last page with matches
+        if not page_incidents and page > 1:
+            match_count = sum(1 for _ in filter_cyber_incidents(incidents_data, **filter_kwargs))
+            page = max(-(-match_count // INCIDENTS_PER_PAGE), 1)
+            offset = (page - 1) * INCIDENTS_PER_PAGE
+            page_incidents = list(islice(filter_cyber_incidents(incidents_data, **filter_kwargs),
+                                         offset, offset + INCIDENTS_PER_PAGE))
+        
+        has_more = len(page_incidents) > INCIDENTS_PER_PAGE
+        del page_incidents[INCIDENTS_PER_PAGE:]
+        
+        # Written back before the page input is built, so it shows the page actually rendered
+        st.session_state["incidents_page"] = page
+        
+        # Show results range; the lazy filter only knows whether another page follows, not the total
+        if page_incidents:
+            more = " (more on the next page)" if has_more else ""
+            st.info(f"Showing matches {offset + 1}-{offset + len(page_incidents)}{more}")
+        if page > 1 or has_more:
+            st.number_input("Page", min_value=1, max_value=page + 1 if has_more else page,
+                            step=1, key="incidents_page")
         
         # Display incidents
-        if not filtered_incidents:
+        if not page_incidents:
             st.info("No incidents found matching your criteria.")
             return
             
-        for incident in filtered_incidents[:20]:  # Limit to 20 for performance
-            severity_color = {
-                'Low': '#10b981',
-                'Medium': '#f59e0b',
-                'High': '#ef4444',
-                'Critical': '#dc2626'
-            }.get(incident['severity'], '#6b7280')
-            
-            status_color = {
-                'Open': '#ef4444',
-                'In Progress': '#f59e0b',
-                'Resolved': '#10b981'
-            }.get(incident['status'], '#6b7280')
-            
-            # FIXED: Removed unsafe_allow_html from expander
-            with st.expander(f"**{incident['title']}** - {incident['severity']} - {incident['status']}"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write(f"**Description:** {incident['description']}")
-                    st.write(f"**Threat Type:** {incident['threat_type']}")
-                    st.write(f"**Created:** {incident['created_at'][:10] if incident['created_at'] else 'N/A'}")
-                    st.markdown(f"**Severity:** <span style='color:{severity_color}'>{incident['severity']}</span>", unsafe_allow_html=True)
-                    st.markdown(f"**Status:** <span style='color:{status_color}'>{incident['status']}</span>", unsafe_allow_html=True)
-                
-                with col2:
-                    st.write(f"**Assigned To:** {incident.get('assigned_to', 'Unassigned')}")
-                    if incident.get('resolved_at'):
-                        st.write(f"**Resolved:** {incident['resolved_at'][:10]}")
-                    if incident.get('resolution_time_hours'):
-                        st.write(f"**Resolution Time:** {incident['resolution_time_hours']} hours")
-                
-                # Action buttons
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    if incident['status'] != 'In Progress' and st.button("Start Progress", key=f"start_{incident['id']}"):
-                        if self.db.update_incident_status(incident['id'], 'In Progress'):
-                            st.success(f"Incident {incident['id']} marked as in progress!")
-                            st.rerun()
-                with col2:
-                    if incident['status'] != 'Resolved' and st.button("Mark Resolved", key=f"resolve_{incident['id']}"):
-                        if self.db.update_incident_status(incident['id'], 'Resolved'):
-                            st.success(f"Incident {incident['id']} marked as resolved!")
-                            st.rerun()
-                with col3:
-                    if st.button("Delete", key=f"delete_{incident['id']}"):
-                        if self.db.delete_incident(incident['id']):
-                            st.success(f"Incident {incident['id']} deleted!")
-                            st.rerun()
-                with col4:
-                    if st.button("Refresh", key=f"refresh_{incident['id']}"):
-                        st.rerun()
+        # One table for the page; details and actions are rendered only for the selected incident
+        page_df = pd.DataFrame(page_incidents, columns=['id', 'title', 'threat_type', 'severity', 'status', 'assigned_to', 'created_at'])
+        event = st.dataframe(
+            page_df,
+            column_config={
+                'id': 'ID',
+                'title': 'Title',
+                'threat_type': 'Threat Type',
+                'severity': 'Severity',
+                'status': 'Status',
+                'assigned_to': 'Assigned To',
+                'created_at': 'Created'
+            },
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="incidents_table"
+        )
+        
+        selected_rows = [row for row in event.selection.rows if row < len(page_incidents)]
+        if not selected_rows:
+            st.caption("Select an incident to view its details and actions.")
+            return
+        
+        incident = page_incidents[selected_rows[0]]
+        severity_color = INCIDENT_SEVERITY_COLOURS.get(incident['severity'], '#6b7280')
+        status_color = INCIDENT_STATUS_COLOURS.get(incident['status'], '#6b7280')
+        
+        st.markdown(f"#### {incident['title']}")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write(f"**Description:** {incident['description']}")
+            st.write(f"**Threat Type:** {incident['threat_type']}")
+            st.write(f"**Created:** {incident['created_at'][:10] if incident['created_at'] else 'N/A'}")
+            st.markdown(f"**Severity:** <span style='color:{severity_color}'>{incident['severity']}</span>", unsafe_allow_html=True)
+            st.markdown(f"**Status:** <span style='color:{status_color}'>{incident['status']}</span>", unsafe_allow_html=True)
+        
+        with col2:
+            st.write(f"**Assigned To:** {incident.get('assigned_to', 'Unassigned')}")
+            if incident.get('resolved_at'):
+                st.write(f"**Resolved:** {incident['resolved_at'][:10]}")
+            if incident.get('resolution_time_hours'):
+                st.write(f"**Resolution Time:** {incident['resolution_time_hours']} hours")
+        
+        # Action buttons
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            if incident['status'] != 'In Progress' and st.button("Start Progress", key=f"start_{incident['id']}"):
+                if self.db.update_incident_status(incident['id'], 'In Progress'):
+                    st.success(f"Incident {incident['id']} marked as in progress!")
+                    st.rerun()
+        with col2:
+            if incident['status'] != 'Resolved' and st.button("Mark Resolved", key=f"resolve_{incident['id']}"):
+                if self.db.update_incident_status(incident['id'], 'Resolved'):
+                    st.success(f"Incident {incident['id']} marked as resolved!")
+                    st.rerun()
+        with col3:
+            if st.button("Delete", key=f"delete_{incident['id']}"):
+                if self.db.delete_incident(incident['id']):
+                    st.success(f"Incident {incident['id']} deleted!")
+                    st.rerun()
+        with col4:
+            if st.button("Refresh", key=f"refresh_{incident['id']}"):
+                st.rerun()
 
     def _show_add_incident_form(self):
         """Display form for adding new security incidents."""
@@ -498,23 +588,28 @@ Focus on immediate actions and long-term improvements."""
                         imported_count = 0
                         errors = []
                         
-                        for incident in incidents:
-                            try:
-                                self.db.create_cyber_incident(incident)
-                                imported_count += 1
-                            except Exception as e:
-                                errors.append(f"Error importing {incident.get('title', 'Unknown')}: {str(e)}")
+                        # Insert every row in one transaction, retrying row by row only if
+                        # it is rolled back so the failing incidents can be reported
+                        try:
+                            imported_count = self.db.bulk_create_cyber_incidents(incidents)
+                        except Exception:
+                            for incident in incidents:
+                                try:
+                                    self.db.create_cyber_incident(incident)
+                                    imported_count += 1
+                                except Exception as e:
+                                    errors.append(f"Error importing {incident.get('title', 'Unknown')}: {str(e)}")
                         
                         if imported_count > 0:
                             st.success(f"✅ Successfully imported {imported_count} of {len(incidents)} incidents!")
                             if errors:
-                                st.warning(f"⚠️ {len(errors)} errors occurred. Check details below.")
+                                st.warning(f"⚠️ {len(errors)} errors occurred.")
                                 with st.expander("View Errors"):
                                     for error in errors[:10]:
                                         st.error(error)
                             st.rerun()
                         else:
-                            st.error("❌ No incidents were imported. Please check the errors above.")
+                            st.error("❌ No incidents were imported.")
                 else:
                     st.error(f"❌ CSV validation failed:\n{error}")
             except Exception as e:
@@ -573,9 +668,7 @@ Focus on immediate actions and long-term improvements."""
         ]
         
         try:
-            for incident in sample_incidents:
-                self.db.create_cyber_incident(incident)
-            
+            self.db.bulk_create_cyber_incidents(sample_incidents)
             st.success("✅ Sample cybersecurity data loaded successfully!")
             st.rerun()
         except Exception as e:
@@ -5,12 +5,232 @@ Provides data quality monitoring, dataset tracking, and analytics insights.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from config import DATA_DEPARTMENTS, SENSITIVITY_LEVELS, QUALITY_SCORE_RANGE
-from utils.search_filter import filter_datasets
-from utils.data_import import parse_csv_file, prepare_dataset_data
+from utils.search_filter import filter_datasets_df
+from utils.data_import import validate_csv_chunks, iter_csv_chunks, prepare_dataset_data
+
+DATASETS_PER_PAGE = 20
+SCATTER_MAX_POINTS = 2000
+QUALITY_LEVELS = ['Low', 'Medium', 'High', 'Excellent']
+QUALITY_LEVEL_EDGES = [5, 7, 9, 10]
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _load_datasets(_db, db_path, version):
+    """Fetch the datasets as columns and build their DataFrame once per table version."""
+    return pd.DataFrame(_db.get_all_datasets_columns())
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _datasets_csv(_df, db_path, version):
+    """Encode the datasets as CSV once per table version."""
+    return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _load_department_aggregates(_db, db_path, version):
+    """Fetch per-department totals, grouped by the database, once per table version."""
+    return pd.DataFrame(_db.get_department_aggregates(), columns=['source_department', 'size_mb', 'row_count', 'quality_score'])
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _department_options(_db, db_path, version):
+    """List the distinct source departments, from the database, once per table version."""
+    return ["All"] + _db.get_distinct_departments()
+
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def _columns_hash(_df, db_path, version, columns):
+    """Hash the contents of the given columns once per table version."""
+    return int(pd.util.hash_pandas_object(_df[list(dict.fromkeys(columns))], index=False).to_numpy().sum())
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def _compute_metrics(_df, db_path, version):
+    """Compute the headline dataset metrics once per table version."""
+    totals = _df.agg({'size_mb': 'sum', 'quality_score': 'mean', 'row_count': 'sum'})
+    quality = _df['quality_score']
+    sensitivity_counts = _df['sensitivity'].value_counts()
+    dept_counts = _df['source_department'].value_counts()
+    return {
+        'dataset_count': len(_df),
+        'total_size': float(totals['size_mb']),
+        'avg_quality': float(totals['quality_score']) if pd.notna(totals['quality_score']) else 0,
+        'total_rows': int(totals['row_count']),
+        'high_sens': int(sensitivity_counts.get('High', 0)),
+        'low_quality': int((quality < 5).sum()),
+        'high_quality': int((quality >= 8).sum()),
+        'n_depts': len(dept_counts),
+        'top_dept': dept_counts.index[0] if len(dept_counts) else 'N/A'
+    }
+
+def _lttb_indices(x, y, n_out):
+    """Pick n_out point indices with Largest-Triangle-Three-Buckets; x must be sorted ascending."""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept, the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's mean
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+def _histogram_figure(series, nbins, title, x_label, colour=None):
+    """Bin a numeric column with np.histogram and draw the counts as bars."""
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=colour
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title="count", bargap=0)
+    return fig
+
+# Figure builders are cached per content hash of the plotted columns and chart options,
+# so widget changes and edits to unrelated columns reuse the existing figures. They are
+# built without a template; each session themes its own copy in _session_figure().
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _fig_size_distribution(_df, db_path, content_hash, chart_type, bins):
+    """Build the dataset size distribution chart."""
+    if chart_type == "Histogram":
+        fig = _histogram_figure(_df['size_mb'], bins, "Dataset Size Distribution (MB)", "Size (MB)", '#6366f1')
+        fig.update_layout(height=300, hovermode='x unified')
+    elif chart_type == "Box Plot":
+        fig = px.box(_df, y='size_mb', title="Dataset Size Distribution (Box Plot)")
+        fig.update_layout(height=300)
+    else:  # Violin
+        fig = px.violin(_df, y='size_mb', title="Dataset Size Distribution (Violin Plot)", box=True)
+        fig.update_layout(height=300)
+    return fig
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _fig_quality_distribution(_df, db_path, content_hash, chart_type):
+    """Build the quality score distribution chart."""
+    if chart_type == "Box Plot":
+        fig = px.box(
+            _df, 
+            y='quality_score', 
+            title="Data Quality Score Distribution",
+            labels={'quality_score': 'Quality Score (1-10)'},
+            color_discrete_sequence=['#10b981']
+        )
+        fig.update_layout(height=300, hovermode='y unified')
+    elif chart_type == "Histogram":
+        fig = _histogram_figure(_df['quality_score'], 20, "Quality Score Distribution", "Quality Score")
+        fig.update_layout(height=300)
+    else:  # Violin
+        fig = px.violin(_df, y='quality_score', title="Quality Score Distribution (Violin)", box=True)
+        fig.update_layout(height=300)
+    return fig
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _fig_department_volume(_dept_data, db_path, version):
+    """Build the data volume by department bar chart."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=_dept_data['source_department'],
+        y=_dept_data['size_mb'],
+        name='Total Size (MB)',
+        marker_color='#6366f1'
+    ))
+    fig.update_layout(
+        title="Data Volume by Department",
+        xaxis_title="Department",
+        yaxis_title="Size (MB)",
+        height=400
+    )
+    return fig
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _fig_quality_by_department(_df, db_path, content_hash):
+    """Build the quality score by department violin plot."""
+    fig = px.violin(
+        _df,
+        x='source_department',
+        y='quality_score',
+        title="Quality Score Distribution by Department",
+        labels={'source_department': 'Department', 'quality_score': 'Quality Score'},
+        box=True
+    )
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _fig_sensitivity_quality_heatmap(_df, db_path, content_hash):
+    """Build the sensitivity vs quality level heatmap."""
+    # Tabulate (sensitivity, quality level) pairs straight into a count matrix
+    codes, sensitivities = pd.factorize(_df['sensitivity'], sort=True)
+    quality = _df['quality_score'].to_numpy(dtype=float, na_value=np.nan)
+    levels = np.searchsorted(QUALITY_LEVEL_EDGES, quality)
+    valid = (codes >= 0) & (quality > 0) & (quality <= QUALITY_LEVEL_EDGES[-1])
+    counts = np.zeros((len(sensitivities), len(QUALITY_LEVELS)), dtype=np.int64)
+    np.add.at(counts, (codes[valid], levels[valid]), 1)
+    
+    # Sensitivities with no scored datasets are left out, as crosstab did
+    present = counts.any(axis=1)
+    counts = counts[present]
+    fig = go.Figure(data=go.Heatmap(
+        z=counts,
+        x=QUALITY_LEVELS,
+        y=list(sensitivities[present]),
+        colorscale='Viridis',
+        text=counts,
+        texttemplate='%{text}',
+        textfont={"size": 10}
+    ))
+    fig.update_layout(
+        title="Sensitivity vs Quality Score Heatmap",
+        xaxis_title="Quality Level",
+        yaxis_title="Sensitivity",
+        height=400
+    )
+    return fig
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _fig_size_quality_scatter(_df, db_path, content_hash, x_axis, y_axis, color_by, size_by):
+    """Build the configurable dataset scatter plot, downsampled when there are too many points to ship."""
+    plot_df = _df.dropna(subset=[x_axis, y_axis])
+    if len(plot_df) > SCATTER_MAX_POINTS:
+        plot_df = plot_df.sort_values(x_axis, kind='mergesort')
+        keep = _lttb_indices(plot_df[x_axis].to_numpy(dtype=float), plot_df[y_axis].to_numpy(dtype=float), SCATTER_MAX_POINTS)
+        plot_df = plot_df.iloc[keep]
+    
+    fig = px.scatter(
+        plot_df,
+        x=x_axis,
+        y=y_axis,
+        size=size_by,
+        color=color_by,
+        title=f"{y_axis.replace('_', ' ').title()} vs {x_axis.replace('_', ' ').title()}",
+        labels={
+            x_axis: x_axis.replace('_', ' ').title(),
+            y_axis: y_axis.replace('_', ' ').title(),
+            size_by: size_by.replace('_', ' ').title(),
+            color_by: color_by.replace('_', ' ').title()
+        },
+        hover_data=['name']
+    )
+    fig.update_layout(height=400, hovermode='closest')
+    return fig
+
+def _reset_datasets_page():
+    """Return the dataset list to its first page after a filter changes."""
+    st.session_state["datasets_page"] = 1
+
+def _iter_uploaded_datasets(uploaded_file):
+    """Yield prepared dataset records from an uploaded CSV, one chunk at a time."""
+    for chunk in iter_csv_chunks(uploaded_file):
+        yield from prepare_dataset_data(chunk)
 
 class DataScienceDashboard:
     """Data Science dashboard for dataset management and analytics."""
@@ -24,44 +244,34 @@ class DataScienceDashboard:
         """Render the data science dashboard interface."""
         st.markdown("# 📊 Data Science Dashboard")
         
-        # Fetch dataset data
-        datasets_data = self.db.get_all_datasets()
+        # Fetch dataset data, reloaded only after the table has been written to
+        version = self.db.get_table_version('datasets_metadata')
+        df = _load_datasets(self.db, self.db.db_path, version)
         
         # Load sample data if none exists
-        if not datasets_data:
+        if df.empty:
             st.info("No datasets available")
             if st.button("Load Sample Data"):
                 self._load_sample_datasets()
                 st.rerun()
             return
         
-        df = pd.DataFrame(datasets_data)
+        # Headline metrics shared by the cards and the quality tab
+        metrics = _compute_metrics(df, self.db.db_path, version)
         
         # Key Metrics Row
         col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            total_size = df['size_mb'].sum()
-            st.markdown(f"<div class='metric-card'><h3>Total Data Size</h3><h2 style='color: #6366f1;'>{total_size:.1f} MB</h2></div>", unsafe_allow_html=True)
-        
-        with col2:
-            avg_quality = df['quality_score'].mean() if 'quality_score' in df.columns and not df['quality_score'].isna().all() else 0
-            st.markdown(f"<div class='metric-card'><h3>Avg Quality Score</h3><h2 style='color: #10b981;'>{avg_quality:.1f}/10</h2></div>", unsafe_allow_html=True)
-        
-        with col3:
-            total_rows = df['row_count'].sum()
-            st.markdown(f"<div class='metric-card'><h3>Total Rows</h3><h2 style='color: #f59e0b;'>{total_rows:,}</h2></div>", unsafe_allow_html=True)
-        
-        with col4:
-            high_sensitivity = len(df[df['sensitivity'] == 'High']) if 'sensitivity' in df.columns else 0
-            st.markdown(f"<div class='metric-card'><h3>High Sensitivity</h3><h2 style='color: #ef4444;'>{high_sensitivity}</h2></div>", unsafe_allow_html=True)
+        col1.metric("Total Data Size", f"{metrics['total_size']:.1f} MB")
+        col2.metric("Avg Quality Score", f"{metrics['avg_quality']:.1f}/10")
+        col3.metric("Total Rows", f"{metrics['total_rows']:,}")
+        col4.metric("High Sensitivity", metrics['high_sens'])
         
         st.markdown("---")
         
         # Export CSV button
         col1, col2 = st.columns([1, 5])
         with col1:
-            csv_data = df.to_csv(index=False)
+            csv_data = _datasets_csv(df, self.db.db_path, version)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             st.download_button(
                 label="📥 Export CSV",
@@ -73,26 +283,43 @@ class DataScienceDashboard:
         
         st.markdown("---")
         
-        # Dashboard Tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Analytics", "📁 Datasets", "➕ Add Dataset", "🔍 Data Quality", "📥 Import Data"])
-        
-        with tab1:
-            self._show_data_science_analytics(df)
-        
-        with tab2:
-            self._show_datasets_list(datasets_data)
+        # Dashboard sections; unlike st.tabs, only the selected one is executed on each rerun
+        section = st.radio(
+            "Section",
+            ["📈 Analytics", "📁 Datasets", "➕ Add Dataset", "🔍 Data Quality", "📥 Import Data"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="data_section"
+        )
         
-        with tab3:
+        if section == "📈 Analytics":
+            self._show_data_science_analytics(df, version)
+        elif section == "📁 Datasets":
+            self._show_datasets_list(df, version)
+        elif section == "➕ Add Dataset":
             self._show_add_dataset_form()
-        
-        with tab4:
-            self._show_data_quality_analysis(datasets_data)
-        
-        with tab5:
+        elif section == "🔍 Data Quality":
+            self._show_data_quality_analysis(df, metrics)
+        else:
             self._show_import_data()
 
-    def _show_data_science_analytics(self, df):
+    def _session_figure(self, name, content_key, template, build):
+        """Reuse this session's copy of a chart, only swapping its template when the theme changes."""
+        state_key = f"ds_fig_{name}"
+        entry = st.session_state.get(state_key)
+        if entry is None or entry['key'] != content_key:
+            # Copy the shared cached figure so theming it never touches other sessions
+            entry = {'key': content_key, 'template': None, 'fig': go.Figure(build())}
+            st.session_state[state_key] = entry
+        if entry['template'] != template:
+            entry['fig'].update_layout(template=template)
+            entry['template'] = template
+        return entry['fig']
+
+    def _show_data_science_analytics(self, df, version):
         """Display data science analytics and charts."""
+        db_path = self.db.db_path
+        template = "plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
         col1, col2 = st.columns(2)
         
         with col1:
@@ -102,35 +329,12 @@ class DataScienceDashboard:
                     chart_type = st.radio("Chart Type", ["Histogram", "Box Plot", "Violin"], horizontal=True, key="size_chart_type")
                     bins = st.slider("Number of Bins", 5, 50, 20, key="size_bins")
                 
-                if chart_type == "Histogram":
-                    fig_size = px.histogram(
-                        df, 
-                        x='size_mb', 
-                        title="Dataset Size Distribution (MB)",
-                        labels={'size_mb': 'Size (MB)'},
-                        color_discrete_sequence=['#6366f1'],
-                        nbins=bins
-                    )
-                    fig_size.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300,
-                        hovermode='x unified'
-                    )
-                    st.plotly_chart(fig_size, use_container_width=True)
-                elif chart_type == "Box Plot":
-                    fig_box = px.box(df, y='size_mb', title="Dataset Size Distribution (Box Plot)")
-                    fig_box.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300
-                    )
-                    st.plotly_chart(fig_box, use_container_width=True)
-                else:  # Violin
-                    fig_violin = px.violin(df, y='size_mb', title="Dataset Size Distribution (Violin Plot)", box=True)
-                    fig_violin.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300
-                    )
-                    st.plotly_chart(fig_violin, use_container_width=True)
+                content_hash = _columns_hash(df, db_path, version, ('size_mb',))
+                fig_size = self._session_figure(
+                    "size", (content_hash, chart_type, bins), template,
+                    lambda: _fig_size_distribution(df, db_path, content_hash, chart_type, bins)
+                )
+                st.plotly_chart(fig_size, use_container_width=True)
             else:
                 st.info("No size data available")
         
@@ -140,62 +344,23 @@ class DataScienceDashboard:
                 with st.expander("⚙️ Customise Chart", expanded=False):
                     chart_type = st.radio("Chart Type", ["Box Plot", "Histogram", "Violin"], horizontal=True, key="quality_chart_type")
                 
-                if chart_type == "Box Plot":
-                    fig_quality = px.box(
-                        df, 
-                        y='quality_score', 
-                        title="Data Quality Score Distribution",
-                        labels={'quality_score': 'Quality Score (1-10)'},
-                        color_discrete_sequence=['#10b981']
-                    )
-                    fig_quality.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300,
-                        hovermode='y unified'
-                    )
-                    st.plotly_chart(fig_quality, use_container_width=True)
-                elif chart_type == "Histogram":
-                    fig_hist = px.histogram(df, x='quality_score', title="Quality Score Distribution", nbins=20)
-                    fig_hist.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300
-                    )
-                    st.plotly_chart(fig_hist, use_container_width=True)
-                else:  # Violin
-                    fig_violin = px.violin(df, y='quality_score', title="Quality Score Distribution (Violin)", box=True)
-                    fig_violin.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=300
-                    )
-                    st.plotly_chart(fig_violin, use_container_width=True)
+                content_hash = _columns_hash(df, db_path, version, ('quality_score',))
+                fig_quality = self._session_figure(
+                    "quality", (content_hash, chart_type), template,
+                    lambda: _fig_quality_distribution(df, db_path, content_hash, chart_type)
+                )
+                st.plotly_chart(fig_quality, use_container_width=True)
             else:
                 st.info("No quality score data available")
         
         # Department-wise Data Volume
         if 'source_department' in df.columns and 'size_mb' in df.columns and len(df) > 0:
             st.markdown("### Department Data Volume")
-            dept_data = df.groupby('source_department').agg({
-                'size_mb': 'sum',
-                'row_count': 'sum',
-                'quality_score': 'mean'
-            }).reset_index()
-            
-            fig_dept = go.Figure()
-            fig_dept.add_trace(go.Bar(
-                x=dept_data['source_department'],
-                y=dept_data['size_mb'],
-                name='Total Size (MB)',
-                marker_color='#6366f1'
-            ))
-            
-            fig_dept.update_layout(
-                title="Data Volume by Department",
-                xaxis_title="Department",
-                yaxis_title="Size (MB)",
-                template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                height=400
+            fig_volume = self._session_figure(
+                "department_volume", version, template,
+                lambda: _fig_department_volume(_load_department_aggregates(self.db, db_path, version), db_path, version)
             )
-            st.plotly_chart(fig_dept, use_container_width=True)
+            st.plotly_chart(fig_volume, use_container_width=True)
         
         # Additional charts row
         st.markdown("---")
@@ -205,17 +370,10 @@ class DataScienceDashboard:
             # Quality Score Distribution by Department
             if 'source_department' in df.columns and 'quality_score' in df.columns and not df.empty:
                 try:
-                    fig_violin = px.violin(
-                        df,
-                        x='source_department',
-                        y='quality_score',
-                        title="Quality Score Distribution by Department",
-                        labels={'source_department': 'Department', 'quality_score': 'Quality Score'},
-                        box=True
-                    )
-                    fig_violin.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=400
+                    content_hash = _columns_hash(df, db_path, version, ('source_department', 'quality_score'))
+                    fig_violin = self._session_figure(
+                        "quality_by_department", content_hash, template,
+                        lambda: _fig_quality_by_department(df, db_path, content_hash)
                     )
                     st.plotly_chart(fig_violin, use_container_width=True)
                 except Exception as e:
@@ -225,23 +383,10 @@ class DataScienceDashboard:
             # Sensitivity vs Quality Heatmap
             if 'sensitivity' in df.columns and 'quality_score' in df.columns and not df.empty:
                 try:
-                    sensitivity_bins = pd.cut(df['quality_score'], bins=[0, 5, 7, 9, 10], labels=['Low', 'Medium', 'High', 'Excellent'])
-                    heatmap_data = pd.crosstab(df['sensitivity'], sensitivity_bins)
-                    fig_heatmap = go.Figure(data=go.Heatmap(
-                        z=heatmap_data.values,
-                        x=heatmap_data.columns,
-                        y=heatmap_data.index,
-                        colorscale='Viridis',
-                        text=heatmap_data.values,
-                        texttemplate='%{text}',
-                        textfont={"size": 10}
-                    ))
-                    fig_heatmap.update_layout(
-                        title="Sensitivity vs Quality Score Heatmap",
-                        xaxis_title="Quality Level",
-                        yaxis_title="Sensitivity",
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        height=400
+                    content_hash = _columns_hash(df, db_path, version, ('sensitivity', 'quality_score'))
+                    fig_heatmap = self._session_figure(
+                        "sensitivity_heatmap", content_hash, template,
+                        lambda: _fig_sensitivity_quality_heatmap(df, db_path, content_hash)
                     )
                     st.plotly_chart(fig_heatmap, use_container_width=True)
                 except Exception as e:
@@ -256,29 +401,14 @@ class DataScienceDashboard:
                 color_by = st.selectbox("Color By", ['source_department', 'sensitivity', 'quality_score'], key="scatter_color")
                 size_by = st.selectbox("Size By", ['size_mb', 'row_count', 'quality_score'], key="scatter_size")
             
-            fig_scatter = px.scatter(
-                df,
-                x=x_axis,
-                y=y_axis,
-                size=size_by,
-                color=color_by,
-                title=f"{y_axis.replace('_', ' ').title()} vs {x_axis.replace('_', ' ').title()}",
-                labels={
-                    x_axis: x_axis.replace('_', ' ').title(),
-                    y_axis: y_axis.replace('_', ' ').title(),
-                    size_by: size_by.replace('_', ' ').title(),
-                    color_by: color_by.replace('_', ' ').title()
-                },
-                hover_data=['name']
-            )
-            fig_scatter.update_layout(
-                template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                height=400,
-                hovermode='closest'
+            content_hash = _columns_hash(df, db_path, version, (x_axis, y_axis, color_by, size_by))
+            fig_scatter = self._session_figure(
+                "scatter", (content_hash, x_axis, y_axis, color_by, size_by), template,
+                lambda: _fig_size_quality_scatter(df, db_path, content_hash, x_axis, y_axis, color_by, size_by)
             )
             st.plotly_chart(fig_scatter, use_container_width=True)
 
-    def _show_datasets_list(self, datasets_data):
+    def _show_datasets_list(self, df, version):
         """Display list of available datasets."""
         st.markdown("### Available Datasets")
         
@@ -287,22 +417,20 @@ class DataScienceDashboard:
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                search_term = st.text_input("🔎 Search", placeholder="Name, department, sensitivity...", key="search_datasets")
+                search_term = st.text_input("🔎 Search", placeholder="Name, department, sensitivity...", key="search_datasets", on_change=_reset_datasets_page)
             
             with col2:
-                departments_list = list(set([ds.get('source_department', '') for ds in datasets_data if ds.get('source_department')]))
-                departments = ["All"] + sorted(departments_list) if departments_list else ["All"]
-                filter_dept = st.selectbox("Department", departments, key="filter_dept")
+                filter_dept = st.selectbox("Department", _department_options(self.db, self.db.db_path, version), key="filter_dept", on_change=_reset_datasets_page)
             
             with col3:
-                filter_sensitivity = st.selectbox("Sensitivity", ["All"] + SENSITIVITY_LEVELS, key="filter_sensitivity")
+                filter_sensitivity = st.selectbox("Sensitivity", ["All"] + SENSITIVITY_LEVELS, key="filter_sensitivity", on_change=_reset_datasets_page)
             
             with col4:
-                quality_range = st.slider("Quality Score Range", 0.0, 10.0, (0.0, 10.0), 0.1, key="quality_range")
+                quality_range = st.slider("Quality Score Range", 0.0, 10.0, (0.0, 10.0), 0.1, key="quality_range", on_change=_reset_datasets_page)
         
-        # Apply filters using utility function
-        filtered_datasets = filter_datasets(
-            datasets_data,
+        # Apply filters as one vectorised mask over the cached frame
+        filtered_df = filter_datasets_df(
+            df,
             search_term=search_term,
             department=filter_dept,
             min_quality=quality_range[0],
@@ -310,15 +438,30 @@ class DataScienceDashboard:
             sensitivity=filter_sensitivity
         )
         
-        # Show results count
-        st.info(f"Showing {len(filtered_datasets)} of {len(datasets_data)} datasets")
-        
         # Display datasets
-        if not filtered_datasets:
+        if filtered_df.empty:
+            st.info(f"Showing 0 of {len(df)} datasets")
             st.info("No datasets found matching your criteria.")
             return
-            
-        for dataset in filtered_datasets[:20]:  # Limit to 20 for performance
+        
+        # Pagination over the filtered rows, clamped (before the widget is built, so the
+        # input shows the page actually rendered) when deletes shrink the result set
+        page_count = -(-len(filtered_df) // DATASETS_PER_PAGE)
+        page = min(st.session_state.get("datasets_page", 1), page_count)
+        st.session_state["datasets_page"] = page
+        offset = (page - 1) * DATASETS_PER_PAGE
+        
+        # Show results range
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.info(f"Showing {offset + 1}-{min(offset + DATASETS_PER_PAGE, len(filtered_df))} of {len(filtered_df)} matching datasets ({len(df)} total)")
+        with col2:
+            st.number_input("Page", min_value=1, max_value=page_count, step=1, key="datasets_page")
+        
+        # Only the visible page is turned back into row dicts
+        page_datasets = filtered_df.iloc[offset:offset + DATASETS_PER_PAGE].to_dict('records')
+        
+        for dataset in page_datasets:
             sensitivity_color = {
                 'Low': '#10b981',
                 'Medium': '#f59e0b',
@@ -327,7 +470,7 @@ class DataScienceDashboard:
             }.get(dataset.get('sensitivity'), '#6b7280')
             
             # Fixed: Removed unsafe_allow_html from expander
-            with st.expander(f"**{dataset['name']}** - {dataset['source_department']}"):
+            with st.expander(f"**{dataset['name']}** - {dataset['source_department']}", expanded=False):
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -337,7 +480,7 @@ class DataScienceDashboard:
                     st.write(f"**Created:** {dataset['created_at'][:10] if dataset['created_at'] else 'N/A'}")
                 
                 with col2:
-                    if dataset.get('quality_score'):
+                    if pd.notna(dataset['quality_score']) and dataset['quality_score']:
                         quality_color = '#10b981' if dataset['quality_score'] >= 7 else '#f59e0b' if dataset['quality_score'] >= 5 else '#ef4444'
                         st.markdown(f"**Quality Score:** <span style='color:{quality_color}'>{dataset['quality_score']}/10</span>", unsafe_allow_html=True)
                     if dataset.get('sensitivity'):
@@ -346,30 +489,32 @@ class DataScienceDashboard:
                     if dataset.get('last_accessed'):
                         st.write(f"**Last Accessed:** {dataset['last_accessed'][:10]}")
                 
-                # Action buttons
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("View Details", key=f"view_{dataset['id']}"):
-                        st.info(f"Showing details for {dataset['name']}")
-                with col2:
-                    if st.button("Update Quality", key=f"update_{dataset['id']}"):
+                # Action widgets are only built once the user opens them for this dataset
+                actions_key = f"open_{dataset['id']}"
+                if st.button("⚙️ Actions", key=f"actions_{dataset['id']}"):
+                    st.session_state[actions_key] = not st.session_state.get(actions_key, False)
+                
+                if st.session_state.get(actions_key):
+                    col1, col2 = st.columns(2)
+                    with col1:
                         with st.form(key=f"update_form_{dataset['id']}"):
                             new_score = st.slider(
                                 "New Quality Score", 
-                                min_value=QUALITY_SCORE_RANGE[0], 
-                                max_value=QUALITY_SCORE_RANGE[1], 
-                                value=float(dataset.get('quality_score', 5)),
+                                min_value=float(QUALITY_SCORE_RANGE[0]), 
+                                max_value=float(QUALITY_SCORE_RANGE[1]), 
+                                value=float(dataset['quality_score']) if pd.notna(dataset['quality_score']) else 5.0,
                                 key=f"score_{dataset['id']}"
                             )
-                            if st.form_submit_button("Save"):
+                            if st.form_submit_button("Update Quality"):
                                 if self.db.update_dataset_quality(dataset['id'], new_score):
                                     st.success("Quality score updated!")
                                     st.rerun()
-                with col3:
-                    if st.button("Delete", key=f"delete_{dataset['id']}"):
-                        if self.db.delete_dataset(dataset['id']):
-                            st.success("Dataset deleted!")
-                            st.rerun()
+                    with col2:
+                        if st.button("Delete", key=f"delete_{dataset['id']}"):
+                            if self.db.delete_dataset(dataset['id']):
+                                st.session_state.pop(actions_key, None)
+                                st.success("Dataset deleted!")
+                                st.rerun()
 
     def _show_add_dataset_form(self):
         """Display form for adding new datasets."""
@@ -442,28 +587,33 @@ class DataScienceDashboard:
         
         if uploaded_file is not None:
             try:
-                success, df, error = parse_csv_file(uploaded_file, "datasets")
+                success, row_count, error = validate_csv_chunks(uploaded_file, "datasets")
                 
                 if success:
-                    st.success(f"✅ CSV file parsed successfully! Found {len(df)} rows.")
+                    st.success(f"✅ CSV file parsed successfully! Found {row_count} rows.")
                     
                     st.markdown("**Preview of data to be imported:**")
-                    st.dataframe(df.head(10), use_container_width=True)
+                    st.dataframe(next(iter_csv_chunks(uploaded_file, chunksize=10)), use_container_width=True)
                     
                     if st.button("Import All Records", type="primary", key="import_data_btn"):
-                        datasets = prepare_dataset_data(df)
                         imported_count = 0
                         errors = []
                         
-                        for dataset in datasets:
-                            try:
-                                self.db.create_dataset(dataset)
-                                imported_count += 1
-                            except Exception as e:
-                                errors.append(f"Error importing {dataset.get('name', 'Unknown')}: {str(e)}")
+                        # Stream the file through in chunks so only one chunk is held in memory.
+                        # Every row goes in one transaction, re-read row by row only if it is
+                        # rolled back so the failing datasets can be reported
+                        try:
+                            imported_count = self.db.bulk_create_datasets(_iter_uploaded_datasets(uploaded_file))
+                        except Exception:
+                            for dataset in _iter_uploaded_datasets(uploaded_file):
+                                try:
+                                    self.db.create_dataset(dataset)
+                                    imported_count += 1
+                                except Exception as e:
+                                    errors.append(f"Error importing {dataset.get('name', 'Unknown')}: {str(e)}")
                         
                         if imported_count > 0:
-                            st.success(f"✅ Successfully imported {imported_count} of {len(datasets)} datasets!")
+                            st.success(f"✅ Successfully imported {imported_count} of {row_count} datasets!")
                             if errors:
                                 st.warning(f"⚠️ {len(errors)} errors occurred.")
                                 with st.expander("View Errors"):
@@ -477,30 +627,25 @@ class DataScienceDashboard:
             except Exception as e:
                 st.error(f"❌ Error processing file: {str(e)}")
     
-    def _show_data_quality_analysis(self, datasets_data):
+    def _show_data_quality_analysis(self, df, metrics):
         """Display data quality analysis and insights."""
         st.markdown("### 🔍 Data Quality Analysis")
         
-        if not datasets_data:
+        if df.empty:
             st.info("No dataset data available for analysis.")
             return
         
         # Calculate quality metrics
-        df = pd.DataFrame(datasets_data)
-        
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            quality_avg = df['quality_score'].mean() if 'quality_score' in df.columns else 0
-            st.metric("Average Quality Score", f"{quality_avg:.1f}/10")
+            st.metric("Average Quality Score", f"{metrics['avg_quality']:.1f}/10")
         
         with col2:
-            low_quality = len(df[df['quality_score'] < 5]) if 'quality_score' in df.columns else 0
-            st.metric("Datasets Needing Improvement", low_quality)
+            st.metric("Datasets Needing Improvement", metrics['low_quality'])
         
         with col3:
-            high_quality = len(df[df['quality_score'] >= 8]) if 'quality_score' in df.columns else 0
-            st.metric("High Quality Datasets", high_quality)
+            st.metric("High Quality Datasets", metrics['high_quality'])
         
         # AI-Powered Quality Analysis
         st.markdown("---")
@@ -512,7 +657,7 @@ class DataScienceDashboard:
             if st.button("📊 Analyse Quality", key="analyse_quality", use_container_width=True):
                 with st.spinner("🤖 AI is analysing data quality..."):
                     if self.ai_engine and hasattr(self.ai_engine, 'analyse_data_quality'):
-                        analysis = self.ai_engine.analyse_data_quality(datasets_data)
+                        analysis = self.ai_engine.analyse_data_quality(df.to_dict('records'))
                         st.markdown("#### Quality Analysis")
                         st.markdown(analysis)
                     else:
@@ -523,18 +668,17 @@ class DataScienceDashboard:
                 with st.spinner("🤖 AI is predicting data trends..."):
                     if self.ai_engine and self.ai_engine.model:
                         try:
-                            df_analysis = pd.DataFrame(datasets_data)
-                            prompt = f"""Based on {len(df_analysis)} datasets, predict:
+                            prompt = f"""Based on {metrics['dataset_count']} datasets, predict:
 1. Expected data growth trends
 2. Quality score improvements needed
 3. Department-specific recommendations
 4. Data governance priorities
 
 Current state:
-- Average quality: {df_analysis['quality_score'].mean():.1f}/10
-- Total size: {df_analysis['size_mb'].sum():.1f} MB
-- Departments: {df_analysis['source_department'].nunique()}
-- Low quality datasets: {len(df_analysis[df_analysis['quality_score'] < 5])}
+- Average quality: {metrics['avg_quality']:.1f}/10
+- Total size: {metrics['total_size']:.1f} MB
+- Departments: {metrics['n_depts']}
+- Low quality datasets: {metrics['low_quality']}
 
 Provide actionable predictions."""
                             prediction = self.ai_engine.chat_with_ai(prompt)
@@ -550,12 +694,10 @@ Provide actionable predictions."""
                 with st.spinner("🤖 AI is generating recommendations..."):
                     if self.ai_engine and self.ai_engine.model:
                         try:
-                            df_analysis = pd.DataFrame(datasets_data)
-                            low_quality = len(df_analysis[df_analysis['quality_score'] < 5])
                             prompt = f"""Provide specific data governance recommendations:
-- {low_quality} datasets need quality improvement
-- Average quality: {df_analysis['quality_score'].mean():.1f}/10
-- Top department: {df_analysis['source_department'].mode()[0] if not df_analysis.empty else 'N/A'}
+- {metrics['low_quality']} datasets need quality improvement
+- Average quality: {metrics['avg_quality']:.1f}/10
+- Top department: {metrics['top_dept']}
 
 Focus on immediate actions and long-term data strategy."""
                             recommendations = self.ai_engine.chat_with_ai(prompt)
@@ -580,8 +722,7 @@ Focus on immediate actions and long-term data strategy."""
             "✅ Regular data quality audits scheduled"
         ]
         
-        for item in checklist_items:
-            st.write(item)
+        st.markdown("\n".join(f"- {item}" for item in checklist_items))
 
     def _load_sample_datasets(self):
         """Load sample dataset data for demonstration."""
@@ -639,9 +780,7 @@ Focus on immediate actions and long-term data strategy."""
         ]
         
         try:
-            for dataset in sample_datasets:
-                self.db.create_dataset(dataset)
-            
+            self.db.bulk_create_datasets(sample_datasets)
             st.success("✅ Sample dataset data loaded successfully!")
             st.rerun()
         except Exception as e:
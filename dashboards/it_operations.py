@@ -3,14 +3,114 @@ IT Operations Dashboard module for IT ticket management and system monitoring.
 Provides ticketing system, performance analytics, and operational insights.
 """
 
+import io
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from config import TICKET_PRIORITIES, TICKET_STATUSES, TICKET_CATEGORIES, TICKET_STAGES
-from utils.search_filter import filter_it_tickets
-from utils.data_import import parse_csv_file, prepare_it_ticket_data
+from config import (TICKET_PRIORITIES, TICKET_STATUSES, TICKET_CATEGORIES, TICKET_STAGES,
+                    TICKET_STATUS_COLOURS)
+from utils.data_import import parse_csv_file, preferred_csv_engine, prepare_it_ticket_data
+
+TICKETS_PER_PAGE = 20
+TICKET_TABLE_COLUMNS = ['title', 'priority', 'status', 'assigned_to', 'current_stage', 'created_at']
+# Repeated labels in an upload are parsed straight into categoricals
+TICKET_CSV_DTYPES = {'priority': 'category', 'status': 'category', 'category': 'category', 'assigned_to': 'category'}
+AREA_CHART_MAX_POINTS = 2000
+SCATTER_MAX_POINTS = 2000
+
+# The ticket fetch is cached per table version, so reruns skip the database
+# until the table has been written to.
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _load_tickets(_db, db_path, version):
+    """Fetch all IT tickets and build their DataFrame once per table version."""
+    tickets = _db.get_all_it_tickets()
+    return tickets, pd.DataFrame(tickets)
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _tickets_csv(_df, db_path, version):
+    """Encode the tickets as CSV once per table version."""
+    return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _parse_ticket_upload(raw_bytes):
+    """Parse and validate an uploaded ticket CSV once per file content."""
+    return parse_csv_file(io.BytesIO(raw_bytes), "it_tickets", dtype=TICKET_CSV_DTYPES, engine=preferred_csv_engine())
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _filter_options(_tickets, db_path, version):
+    """Collect the distinct categories and assignees for the filter dropdowns once per table version."""
+    return {
+        'categories': ["All"] + sorted({t['category'] for t in _tickets if t.get('category')}),
+        'assignees': ["All"] + sorted({t['assigned_to'] for t in _tickets if t.get('assigned_to')})
+    }
+
+@st.cache_data(ttl=60, max_entries=2, show_spinner=False)
+def _ticket_aggregates(_df, db_path, version):
+    """Compute the counts, averages and plotted series behind the ticket charts once per table version."""
+    # Daily counts stay on a datetime64 index; .dt.date would group on Python date objects
+    created_at = pd.to_datetime(_df['created_at'], format='ISO8601', errors='coerce').dropna()
+    daily_tickets = created_at.dt.normalize().value_counts().sort_index()
+    # Long histories are summed into weekly buckets to bound the trend chart's point count
+    if len(daily_tickets) > AREA_CHART_MAX_POINTS:
+        daily_tickets = daily_tickets.resample('W').sum()
+    
+    # The scatter plots a fixed-seed sample once there are more points than the browser draws usefully
+    scatter_points = _df[_df['time_in_stage_hours'].notna()]
+    if len(scatter_points) > SCATTER_MAX_POINTS:
+        scatter_points = scatter_points.sample(n=SCATTER_MAX_POINTS, random_state=0)
+    
+    return {
+        'priority_counts': _df['priority'].value_counts(),
+        'status_counts': _df['status'].value_counts(),
+        'category_time': _df.groupby('category')['time_in_stage_hours'].mean().reset_index(),
+        'heatmap': _df.groupby(['category', 'priority'], observed=True).size().unstack(fill_value=0),
+        'team_performance': _df.groupby('assigned_to', observed=True).agg(**{
+            'Ticket Count': ('id', 'count'),
+            'Avg Resolution (hours)': ('time_in_stage_hours', 'mean')
+        }),
+        'daily_tickets': daily_tickets,
+        'scatter_points': scatter_points
+    }
+
+# Distribution charts are cached on the plotted counts, chart options and theme,
+# so switching tabs or radios reuses figures that were already built.
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _fig_distribution(counts_items, kind, title, show_values, colours, template):
+    """Build a pie, donut, bar or horizontal bar chart from (label, count) pairs."""
+    labels, values = (list(column) for column in zip(*counts_items)) if counts_items else ([], [])
+    marker_colours = [colours.get(label, '#6b7280') for label in labels] if colours else None
+    
+    if kind in ("Pie", "Donut"):
+        fig = go.Figure(go.Pie(
+            labels=labels,
+            values=values,
+            hole=0.4 if kind == "Donut" else 0,
+            marker=dict(colors=marker_colours or px.colors.qualitative.Set2),
+            textinfo='percent+label' if show_values else 'label',
+            textposition='inside'
+        ))
+        hovermode = 'closest'
+    else:
+        horizontal = kind == "Horizontal Bar"
+        fig = go.Figure(go.Bar(
+            x=values if horizontal else labels,
+            y=labels if horizontal else values,
+            orientation='h' if horizontal else 'v',
+            marker_color=marker_colours,
+            text=values if show_values else None,
+            textposition='auto'
+        ))
+        hovermode = 'y unified' if horizontal else 'x unified'
+    
+    fig.update_layout(
+        title=f"{title} ({kind})",
+        showlegend=kind in ("Pie", "Donut"),
+        template=template,
+        hovermode=hovermode
+    )
+    return fig
 
 class ITOperationsDashboard:
     """IT Operations dashboard for ticket management and system monitoring."""
@@ -24,8 +124,9 @@ class ITOperationsDashboard:
         """Render the IT operations dashboard interface."""
         st.markdown("# 💻 IT Operations Dashboard")
         
-        # Fetch ticket data
-        tickets_data = self.db.get_all_it_tickets()
+        # Fetch ticket data, reloaded only after the table has been written to
+        version = self.db.get_table_version('it_tickets')
+        tickets_data, df = _load_tickets(self.db, self.db.db_path, version)
         
         # Load sample data if none exists
         if not tickets_data:
@@ -35,13 +136,14 @@ class ITOperationsDashboard:
                 st.rerun()
             return
         
-        df = pd.DataFrame(tickets_data)
+        aggregates = _ticket_aggregates(df, self.db.db_path, version)
+        status_counts = aggregates['status_counts']
         
-        # Key Metrics Row
+        # Key Metrics Row, read from the cached counts rather than filtering the frame per metric
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            open_tickets = len(df[df['status'] == 'Open'])
+            open_tickets = int(status_counts.get('Open', 0))
             st.markdown(f"<div class='metric-card'><h3>Open Tickets</h3><h2 style='color: #ef4444;'>{open_tickets}</h2></div>", unsafe_allow_html=True)
         
         with col2:
@@ -49,11 +151,11 @@ class ITOperationsDashboard:
             st.markdown(f"<div class='metric-card'><h3>Avg Time in Stage</h3><h2 style='color: #f59e0b;'>{avg_resolution:.1f}h</h2></div>", unsafe_allow_html=True)
         
         with col3:
-            high_priority = len(df[df['priority'] == 'High']) if 'priority' in df.columns else 0
+            high_priority = int(aggregates['priority_counts'].get('High', 0))
             st.markdown(f"<div class='metric-card'><h3>High Priority</h3><h2 style='color: #ef4444;'>{high_priority}</h2></div>", unsafe_allow_html=True)
         
         with col4:
-            closed_tickets = len(df[df['status'] == 'Closed'])
+            closed_tickets = int(status_counts.get('Closed', 0))
             st.markdown(f"<div class='metric-card'><h3>Closed Tickets</h3><h2 style='color: #10b981;'>{closed_tickets}</h2></div>", unsafe_allow_html=True)
         
         st.markdown("---")
@@ -61,7 +163,7 @@ class ITOperationsDashboard:
         # Export CSV button
         col1, col2 = st.columns([1, 5])
         with col1:
-            csv_data = df.to_csv(index=False)
+            csv_data = _tickets_csv(df, self.db.db_path, version)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             st.download_button(
                 label="📥 Export CSV",
@@ -77,127 +179,55 @@ class ITOperationsDashboard:
         tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Analytics", "🎫 Tickets", "➕ Add Ticket", "🚀 Performance", "📥 Import Data"])
         
         with tab1:
-            self._show_it_operations_analytics(df)
+            self._show_it_operations_analytics(df, aggregates)
         
         with tab2:
-            self._show_tickets_list(tickets_data)
+            self._show_tickets_list(len(df), _filter_options(tickets_data, self.db.db_path, version))
         
         with tab3:
             self._show_add_ticket_form()
         
         with tab4:
-            self._show_performance_metrics(tickets_data)
+            self._show_performance_metrics(df, aggregates)
         
         with tab5:
             self._show_import_data()
 
-    def _show_it_operations_analytics(self, df):
+    def _show_it_operations_analytics(self, df, aggregates):
         """Display IT operations analytics and charts."""
         col1, col2 = st.columns(2)
         
+        template = "plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
+        
         with col1:
             # Interactive Priority Distribution
             if 'priority' in df.columns:
-                priority_counts = df['priority'].value_counts()
                 with st.expander("⚙️ Customise Chart", expanded=False):
                     chart_type = st.radio("Chart Type", ["Pie", "Bar", "Donut"], horizontal=True, key="priority_chart_type")
                     show_values = st.checkbox("Show Values", value=True, key="priority_show_values")
                 
-                if chart_type == "Pie":
-                    fig_priority = px.pie(
-                        values=priority_counts.values, 
-                        names=priority_counts.index, 
-                        title="Ticket Priority Distribution",
-                        color_discrete_sequence=px.colors.qualitative.Set2
-                    )
-                    if show_values:
-                        fig_priority.update_traces(textposition='inside', textinfo='percent+label')
-                    fig_priority.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        hovermode='closest'
-                    )
-                    st.plotly_chart(fig_priority, use_container_width=True)
-                elif chart_type == "Donut":
-                    fig_donut = go.Figure(data=[go.Pie(
-                        labels=priority_counts.index,
-                        values=priority_counts.values,
-                        hole=0.4,
-                        textinfo='label+percent' if show_values else 'label'
-                    )])
-                    fig_donut.update_layout(
-                        title="Priority Distribution (Donut)",
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
-                    )
-                    st.plotly_chart(fig_donut, use_container_width=True)
-                else:  # Bar
-                    fig_bar = px.bar(
-                        x=priority_counts.index,
-                        y=priority_counts.values,
-                        title="Priority Distribution",
-                        text=priority_counts.values if show_values else None
-                    )
-                    fig_bar.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        xaxis_tickangle=-45
-                    )
-                    st.plotly_chart(fig_bar, use_container_width=True)
+                fig_priority = _fig_distribution(
+                    tuple(aggregates['priority_counts'].items()), chart_type,
+                    "Ticket Priority Distribution", show_values, None, template
+                )
+                st.plotly_chart(fig_priority, use_container_width=True)
         
         with col2:
             # Interactive Status Distribution
             if 'status' in df.columns:
-                status_counts = df['status'].value_counts()
                 with st.expander("⚙️ Customise Chart", expanded=False):
                     chart_type = st.radio("Chart Type", ["Bar", "Pie", "Horizontal Bar"], horizontal=True, key="status_chart_type")
                 
-                if chart_type == "Bar":
-                    fig_status = px.bar(
-                        x=status_counts.index, 
-                        y=status_counts.values,
-                        title="Ticket Status Distribution",
-                        color=status_counts.index,
-                        color_discrete_map={
-                            'Open': '#ef4444',
-                            'In Progress': '#f59e0b',
-                            'Resolved': '#10b981',
-                            'Closed': '#6b7280'
-                        }
-                    )
-                    fig_status.update_layout(
-                        showlegend=False,
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
-                        hovermode='x unified'
-                    )
-                    st.plotly_chart(fig_status, use_container_width=True)
-                elif chart_type == "Pie":
-                    fig_pie = px.pie(values=status_counts.values, names=status_counts.index, title="Status Distribution")
-                    fig_pie.update_layout(
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
-                    )
-                    st.plotly_chart(fig_pie, use_container_width=True)
-                else:  # Horizontal Bar
-                    fig_hbar = px.bar(
-                        x=status_counts.values,
-                        y=status_counts.index,
-                        orientation='h',
-                        title="Status Distribution (Horizontal)",
-                        color=status_counts.index,
-                        color_discrete_map={
-                            'Open': '#ef4444',
-                            'In Progress': '#f59e0b',
-                            'Resolved': '#10b981',
-                            'Closed': '#6b7280'
-                        }
-                    )
-                    fig_hbar.update_layout(
-                        showlegend=False,
-                        template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white"
-                    )
-                    st.plotly_chart(fig_hbar, use_container_width=True)
+                fig_status = _fig_distribution(
+                    tuple(aggregates['status_counts'].items()), chart_type,
+                    "Ticket Status Distribution", True, TICKET_STATUS_COLOURS, template
+                )
+                st.plotly_chart(fig_status, use_container_width=True)
         
         # Time in Stage by Category
         if 'category' in df.columns and 'time_in_stage_hours' in df.columns:
             st.markdown("### Performance by Category")
-            category_time = df.groupby('category')['time_in_stage_hours'].mean().reset_index()
+            category_time = aggregates['category_time']
             
             fig_category = go.Figure()
             fig_category.add_trace(go.Bar(
@@ -225,7 +255,7 @@ class ITOperationsDashboard:
             # Priority vs Category Heatmap
             if 'priority' in df.columns and 'category' in df.columns and not df.empty:
                 try:
-                    heatmap_data = pd.crosstab(df['category'], df['priority'])
+                    heatmap_data = aggregates['heatmap']
                     fig_heatmap = go.Figure(data=go.Heatmap(
                         z=heatmap_data.values,
                         x=heatmap_data.columns,
@@ -250,7 +280,7 @@ class ITOperationsDashboard:
             # Resolution Time by Priority Scatter
             if 'priority' in df.columns and 'time_in_stage_hours' in df.columns and not df.empty:
                 try:
-                    resolution_df = df[df['time_in_stage_hours'].notna()]
+                    resolution_df = aggregates['scatter_points']
                     if not resolution_df.empty:
                         fig_scatter = px.scatter(
                             resolution_df,
@@ -260,7 +290,8 @@ class ITOperationsDashboard:
                             size='time_in_stage_hours',
                             title="Resolution Time by Priority",
                             labels={'time_in_stage_hours': 'Time in Stage (hours)', 'priority': 'Priority'},
-                            hover_data=['title']
+                            hover_data=['title'],
+                            render_mode='webgl'
                         )
                         fig_scatter.update_layout(
                             template="plotly_dark" if st.session_state.get('dark_mode', True) else "plotly_white",
@@ -274,13 +305,10 @@ class ITOperationsDashboard:
         
         # Ticket Creation Trend Area Chart
         if 'created_at' in df.columns:
-            df['created_at'] = pd.to_datetime(df['created_at'], format='ISO8601', errors='coerce')
-            df = df.dropna(subset=['created_at'])
-            df['date'] = df['created_at'].dt.date
-            daily_tickets = df.groupby('date').size()
+            daily_tickets = aggregates['daily_tickets']
             
             fig_area = go.Figure()
-            fig_area.add_trace(go.Scatter(
+            fig_area.add_trace(go.Scattergl(
                 x=daily_tickets.index,
                 y=daily_tickets.values,
                 mode='lines',
@@ -299,7 +327,7 @@ class ITOperationsDashboard:
             
             st.plotly_chart(fig_area, use_container_width=True)
 
-    def _show_tickets_list(self, tickets_data):
+    def _show_tickets_list(self, total_tickets, filter_options):
         """Display list of IT tickets."""
         st.markdown("### IT Service Tickets")
         
@@ -311,9 +339,7 @@ class ITOperationsDashboard:
                 search_term = st.text_input("🔎 Search", placeholder="Title, description, category...", key="search_tickets")
             
             with col2:
-                categories_list = list(set([t.get('category', '') for t in tickets_data if t.get('category')]))
-                categories = ["All"] + sorted(categories_list) if categories_list else ["All"]
-                filter_category = st.selectbox("Category", categories, key="filter_category")
+                filter_category = st.selectbox("Category", filter_options['categories'], key="filter_category")
             
             with col3:
                 filter_priority = st.selectbox("Priority", ["All"] + TICKET_PRIORITIES, key="filter_priority")
@@ -324,60 +350,75 @@ class ITOperationsDashboard:
             # Assigned to filter
             col5, col6 = st.columns(2)
             with col5:
-                assignees_list = list(set([t.get('assigned_to', '') for t in tickets_data if t.get('assigned_to')]))
-                assignees = ["All"] + sorted(assignees_list) if assignees_list else ["All"]
-                filter_assigned = st.selectbox("Assigned To", assignees, key="filter_assigned")
+                filter_assigned = st.selectbox("Assigned To", filter_options['assignees'], key="filter_assigned")
         
-        # Apply filters using utility function
-        filtered_tickets = filter_it_tickets(
-            tickets_data,
+        # Filtering runs in the database, which only returns the rows that will be shown
+        filtered_tickets, match_count = self.db.get_it_tickets_filtered(
             search_term=search_term,
             category=filter_category,
             priority=filter_priority,
             status=filter_status,
-            assigned_to=filter_assigned
+            assigned_to=filter_assigned,
+            limit=TICKETS_PER_PAGE
         )
         
         # Show results count
-        st.info(f"Showing {len(filtered_tickets)} of {len(tickets_data)} tickets")
+        st.info(f"Showing {match_count} of {total_tickets} tickets")
         
-        # Display tickets
-        for ticket in filtered_tickets[:20]:  # Limit to 20 for performance
-            # Fixed: Removed unsafe_allow_html from expander
-            with st.expander(f"**{ticket['title']}** - {ticket.get('priority', 'Medium')} - {ticket['status']}"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write(f"**Description:** {ticket['description']}")
-                    st.write(f"**Assigned To:** {ticket['assigned_to']}")
-                    st.write(f"**Current Stage:** {ticket['current_stage']}")
-                    st.write(f"**Created:** {ticket['created_at'][:10]}")
-                
-                with col2:
-                    if ticket.get('category'):
-                        st.write(f"**Category:** {ticket['category']}")
-                    if ticket.get('time_in_stage_hours'):
-                        st.write(f"**Time in Stage:** {ticket['time_in_stage_hours']} hours")
-                    if ticket.get('resolved_at'):
-                        st.write(f"**Resolved:** {ticket['resolved_at'][:10]}")
-                
-                # Action buttons
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("Start Progress", key=f"start_{ticket['id']}"):
-                        if self.db.update_ticket_status(ticket['id'], 'In Progress', 'In Progress'):
-                            st.success("Ticket marked as in progress!")
-                            st.rerun()
-                with col2:
-                    if st.button("Mark Resolved", key=f"resolve_{ticket['id']}"):
-                        if self.db.update_ticket_status(ticket['id'], 'Resolved', 'Resolved'):
-                            st.success("Ticket marked as resolved!")
-                            st.rerun()
-                with col3:
-                    if st.button("Close Ticket", key=f"close_{ticket['id']}"):
-                        if self.db.update_ticket_status(ticket['id'], 'Closed', 'Closed'):
-                            st.success("Ticket closed!")
-                            st.rerun()
+        if not filtered_tickets:
+            return
+        
+        # One selectable table for the page; details and actions are only built for the chosen ticket
+        table = st.dataframe(
+            pd.DataFrame(filtered_tickets, columns=TICKET_TABLE_COLUMNS),
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="it_tickets_table"
+        )
+        selected_rows = table.selection.rows
+        
+        # The stored selection can point past the page once the filters shrink it
+        if not selected_rows or selected_rows[0] >= len(filtered_tickets):
+            st.caption("Select a ticket to view its details and actions.")
+            return
+        
+        ticket = filtered_tickets[selected_rows[0]]
+        st.markdown(f"#### {ticket['title']}")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write(f"**Description:** {ticket['description']}")
+            st.write(f"**Assigned To:** {ticket['assigned_to']}")
+            st.write(f"**Current Stage:** {ticket['current_stage']}")
+            st.write(f"**Created:** {ticket['created_at'][:10]}")
+        
+        with col2:
+            if ticket.get('category'):
+                st.write(f"**Category:** {ticket['category']}")
+            if ticket.get('time_in_stage_hours'):
+                st.write(f"**Time in Stage:** {ticket['time_in_stage_hours']} hours")
+            if ticket.get('resolved_at'):
+                st.write(f"**Resolved:** {ticket['resolved_at'][:10]}")
+        
+        # Action buttons
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Start Progress", key=f"start_{ticket['id']}"):
+                if self.db.update_ticket_status(ticket['id'], 'In Progress', 'In Progress'):
+                    st.success("Ticket marked as in progress!")
+                    st.rerun()
+        with col2:
+            if st.button("Mark Resolved", key=f"resolve_{ticket['id']}"):
+                if self.db.update_ticket_status(ticket['id'], 'Resolved', 'Resolved'):
+                    st.success("Ticket marked as resolved!")
+                    st.rerun()
+        with col3:
+            if st.button("Close Ticket", key=f"close_{ticket['id']}"):
+                if self.db.update_ticket_status(ticket['id'], 'Closed', 'Closed'):
+                    st.success("Ticket closed!")
+                    st.rerun()
 
     def _show_add_ticket_form(self):
         """Display form for adding new IT tickets."""
@@ -436,7 +477,8 @@ class ITOperationsDashboard:
         
         if uploaded_file is not None:
             try:
-                success, df, error = parse_csv_file(uploaded_file, "it_tickets")
+                # Cached on the file contents, so clicking import reuses the preview's parse
+                success, df, error = _parse_ticket_upload(uploaded_file.getvalue())
                 
                 if success:
                     st.success(f"✅ CSV file parsed successfully! Found {len(df)} rows.")
@@ -449,12 +491,17 @@ class ITOperationsDashboard:
                         imported_count = 0
                         errors = []
                         
-                        for ticket in tickets:
-                            try:
-                                self.db.create_it_ticket(ticket)
-                                imported_count += 1
-                            except Exception as e:
-                                errors.append(f"Error importing {ticket.get('title', 'Unknown')}: {str(e)}")
+                        # Insert every row in one transaction, retrying row by row only if
+                        # it is rolled back so the failing tickets can be reported
+                        try:
+                            imported_count = self.db.bulk_create_it_tickets(tickets)
+                        except Exception:
+                            for ticket in tickets:
+                                try:
+                                    self.db.create_it_ticket(ticket)
+                                    imported_count += 1
+                                except Exception as e:
+                                    errors.append(f"Error importing {ticket.get('title', 'Unknown')}: {str(e)}")
                         
                         if imported_count > 0:
                             st.success(f"✅ Successfully imported {imported_count} of {len(tickets)} tickets!")
@@ -471,21 +518,22 @@ class ITOperationsDashboard:
             except Exception as e:
                 st.error(f"❌ Error processing file: {str(e)}")
     
-    def _show_performance_metrics(self, tickets_data):
+    def _show_performance_metrics(self, df, aggregates):
         """Display IT performance metrics and SLAs."""
         st.markdown("### 🚀 Performance Metrics & SLAs")
         
-        if not tickets_data:
+        if df.empty:
             st.info("No ticket data available for performance analysis.")
             return
         
-        df = pd.DataFrame(tickets_data)
+        status_counts = aggregates['status_counts']
+        open_count = int(status_counts.get('Open', 0))
         
         # Performance Metrics
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            resolution_rate = len(df[df['status'] == 'Resolved']) / len(df) * 100 if len(df) > 0 else 0
+            resolution_rate = int(status_counts.get('Resolved', 0)) / len(df) * 100
             st.metric("Resolution Rate", f"{resolution_rate:.1f}%")
         
         with col2:
@@ -515,12 +563,7 @@ class ITOperationsDashboard:
         st.markdown("### 👥 Team Performance")
         
         if 'assigned_to' in df.columns:
-            team_performance = df.groupby('assigned_to').agg({
-                'id': 'count',
-                'time_in_stage_hours': 'mean'
-            }).rename(columns={'id': 'Ticket Count', 'time_in_stage_hours': 'Avg Resolution (hours)'})
-            
-            st.dataframe(team_performance, use_container_width=True)
+            st.dataframe(aggregates['team_performance'], use_container_width=True)
         
         # AI-Powered Insights
         st.markdown("---")
@@ -533,13 +576,12 @@ class ITOperationsDashboard:
                 with st.spinner("🤖 AI is analysing performance..."):
                     if self.ai_engine and self.ai_engine.model:
                         try:
-                            open_count = len(df[df['status'] == 'Open'])
                             avg_time = df['time_in_stage_hours'].mean() if 'time_in_stage_hours' in df.columns else 0
                             prompt = f"""Analyse IT operations performance:
 - {open_count} open tickets out of {len(df)} total
 - Average resolution time: {avg_time:.1f} hours
 - Top category: {df['category'].mode()[0] if 'category' in df.columns and not df.empty else 'N/A'}
-- Priority distribution: {df['priority'].value_counts().to_dict() if 'priority' in df.columns else {}}
+- Priority distribution: {aggregates['priority_counts'].to_dict()}
 
 Provide performance analysis and identify bottlenecks."""
                             analysis = self.ai_engine.chat_with_ai(prompt)
@@ -562,7 +604,7 @@ Provide performance analysis and identify bottlenecks."""
 4. Recommended staffing levels
 
 Current metrics:
-- Open tickets: {len(df[df['status'] == 'Open'])}
+- Open tickets: {open_count}
 - Average resolution: {df['time_in_stage_hours'].mean():.1f} hours
 - Top categories: {df['category'].value_counts().head(3).to_dict() if 'category' in df.columns else {}}
 
@@ -581,7 +623,7 @@ Provide actionable predictions."""
                     if self.ai_engine and self.ai_engine.model:
                         try:
                             prompt = f"""Provide IT operations recommendations:
-- {len(df[df['status'] == 'Open'])} open tickets
+- {open_count} open tickets
 - Average resolution: {df['time_in_stage_hours'].mean():.1f} hours
 - Top issue category: {df['category'].mode()[0] if 'category' in df.columns and not df.empty else 'N/A'}
 
@@ -641,7 +683,6 @@ Focus on improving efficiency and reducing resolution times."""
             }
         ]
         
-        for ticket in sample_tickets:
-            self.db.create_it_ticket(ticket)
+        self.db.bulk_create_it_tickets(sample_tickets)
         
         st.success("Sample IT ticket data loaded successfully!")
\ No newline at end of file
@@ -1,8 +1,12 @@
 import sqlite3
-import bcrypt
-from typing import Optional, Dict, List, Any
+from collections import Counter
+from typing import Optional, Dict, List, Any, Iterable
+from config import DEFAULT_USERS
+from auth.passwords import hash_password
 
 class DatabaseManager:
+    VERSIONED_TABLES = ("cyber_incidents", "datasets_metadata", "it_tickets")
+
     def __init__(self, db_path: str = "intelligence_platform.db"):
         self.db_path = db_path
         self.init_database()
@@ -18,7 +22,7 @@ class DatabaseManager:
         tables = [
             '''CREATE TABLE IF NOT EXISTS users (
                 username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
+                password_hash BLOB NOT NULL,
                 role TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )''',
@@ -64,26 +68,37 @@ class DatabaseManager:
         for table_sql in tables:
             cursor.execute(table_sql)
         
-        # Insert default users
-        default_users = [
-            ("admin", bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8'), "admin"),
-            ("cyber", bcrypt.hashpw("cyber123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8'), "cybersecurity"), 
-            ("data", bcrypt.hashpw("data123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8'), "data_science"),
-            ("it", bcrypt.hashpw("it123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8'), "it_operations")
-        ]
+        # Lets the department dropdown and per-department totals read an index instead of the table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_datasets_department ON datasets_metadata (source_department)")
         
-        for username, hashed_pw, role in default_users:
+        # Version counters bumped on every write, used as cheap cache keys
+        cursor.execute('''CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )''')
+        for table_name in self.VERSIONED_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", (table_name,))
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {table_name}_{event.lower()}_version
+                    AFTER {event} ON {table_name}
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE table_name = '{table_name}';
+                    END''')
+        
+        # Insert default users, only hashing passwords for accounts that are missing
+        for username, details in DEFAULT_USERS.items():
             cursor.execute("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
             if cursor.fetchone()[0] == 0:
+                hashed_pw = hash_password(details['password'])
                 cursor.execute(
                     "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, hashed_pw, role)
+                    (username, hashed_pw, details['role'])
                 )
         
         conn.commit()
         conn.close()
 
-    def create_user(self, username: str, password_hash: str, role: str) -> bool:
+    def create_user(self, username: str, password_hash: bytes, role: str) -> bool:
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
@@ -110,6 +125,20 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def update_user_password(self, username: str, password_hash: bytes) -> bool:
+        """Replace the stored password hash for a user."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error updating password: {e}")
+            return False
+        finally:
+            conn.close()
+
     def get_cyber_incidents(self) -> List[Dict[str, Any]]:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -122,6 +151,22 @@ class DatabaseManager:
             'resolution_time_hours': row[8], 'assigned_to': row[9]
         } for row in incidents]
 
+    def get_cyber_incidents_arrow(self):
+        """Get all incidents as a pyarrow Table, or None when the ADBC SQLite driver is unavailable."""
+        try:
+            import adbc_driver_sqlite.dbapi
+        except ImportError:
+            return None
+        
+        try:
+            with adbc_driver_sqlite.dbapi.connect(self.db_path) as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT * FROM cyber_incidents ORDER BY created_at DESC")
+                    return cursor.fetch_arrow_table()
+        except Exception as e:
+            print(f"Arrow fetch failed, falling back to sqlite3: {e}")
+            return None
+
     def get_all_datasets(self) -> List[Dict[str, Any]]:
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -134,70 +179,169 @@ class DatabaseManager:
             'last_accessed': row[7], 'created_at': row[8], 'sensitivity': row[9]
         } for row in datasets]
 
+    def get_all_datasets_columns(self) -> Dict[str, List[Any]]:
+        """Get all datasets as one list per column, ready to build a DataFrame from."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM datasets_metadata ORDER BY created_at DESC")
+            rows = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+            values = list(zip(*rows)) if rows else [()] * len(columns)
+            return {column: list(column_values) for column, column_values in zip(columns, values)}
+        finally:
+            conn.close()
+
+    def _ticket_from_row(self, row: tuple) -> Dict[str, Any]:
+        return {
+            'id': row[0], 'title': row[1], 'description': row[2], 'status': row[3],
+            'assigned_to': row[4], 'current_stage': row[5], 'priority': row[6],
+            'created_at': row[7], 'resolved_at': row[8], 'time_in_stage_hours': row[9], 'category': row[10]
+        }
+
     def get_all_it_tickets(self) -> List[Dict[str, Any]]:
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM it_tickets ORDER BY created_at DESC")
         tickets = cursor.fetchall()
         conn.close()
-        return [{
-            'id': row[0], 'title': row[1], 'description': row[2], 'status': row[3],
-            'assigned_to': row[4], 'current_stage': row[5], 'priority': row[6],
-            'created_at': row[7], 'resolved_at': row[8], 'time_in_stage_hours': row[9], 'category': row[10]
-        } for row in tickets]
+        return [self._ticket_from_row(row) for row in tickets]
 
-    def create_cyber_incident(self, data: Dict[str, Any]) -> int:
+    def get_it_tickets_filtered(self, search_term: str = "", category: str = "All", priority: str = "All",
+                                status: str = "All", assigned_to: str = "All",
+                                limit: int = 20, offset: int = 0) -> tuple:
+        """Get one page of IT tickets matching the list filters, with the total number of matches."""
+        conditions, params = [], []
+        
+        # Case-insensitive substring search, with LIKE wildcards in the term matched literally
+        if search_term:
+            pattern = '%' + search_term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(" + " OR ".join(
+                f"{column} LIKE ? ESCAPE '\\'" for column in ('title', 'description', 'category', 'assigned_to')
+            ) + ")")
+            params.extend([pattern] * 4)
+        
+        # Exact-match filters, skipped when left on "All"
+        for column, value in (('category', category), ('priority', priority),
+                              ('status', status), ('assigned_to', assigned_to)):
+            if value != "All":
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO cyber_incidents 
-            (title, description, threat_type, severity, status, created_at, resolved_at, resolution_time_hours, assigned_to)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM it_tickets {where}", params)
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT * FROM it_tickets {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+            return [self._ticket_from_row(row) for row in cursor.fetchall()], total
+        finally:
+            conn.close()
+
+    INSERT_INCIDENT_SQL = '''
+        INSERT INTO cyber_incidents 
+        (title, description, threat_type, severity, status, created_at, resolved_at, resolution_time_hours, assigned_to)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def _incident_params(self, data: Dict[str, Any]) -> tuple:
+        return (
             data['title'], data['description'], data['threat_type'],
             data['severity'], data['status'], data['created_at'], 
             data.get('resolved_at'), data.get('resolution_time_hours'),
             data.get('assigned_to')
-        ))
+        )
+
+    def create_cyber_incident(self, data: Dict[str, Any]) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self.INSERT_INCIDENT_SQL, self._incident_params(data))
         incident_id = cursor.lastrowid
         conn.commit()
         conn.close()
         return incident_id
 
-    def create_dataset(self, data: Dict[str, Any]) -> int:
+    def bulk_create_cyber_incidents(self, records: List[Dict[str, Any]]) -> int:
+        """Insert many incidents in one transaction and return how many were added."""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO datasets_metadata 
-            (name, source_department, size_mb, row_count, column_count, quality_score, last_accessed, created_at, sensitivity)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        try:
+            with conn:
+                conn.executemany(self.INSERT_INCIDENT_SQL, [self._incident_params(data) for data in records])
+            return len(records)
+        finally:
+            conn.close()
+
+    INSERT_DATASET_SQL = '''
+        INSERT INTO datasets_metadata 
+        (name, source_department, size_mb, row_count, column_count, quality_score, last_accessed, created_at, sensitivity)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def _dataset_params(self, data: Dict[str, Any]) -> tuple:
+        return (
             data['name'], data['source_department'], data['size_mb'], data['row_count'],
             data['column_count'], data.get('quality_score'), data.get('last_accessed'),
             data.get('created_at'), data.get('sensitivity')
-        ))
+        )
+
+    def create_dataset(self, data: Dict[str, Any]) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self.INSERT_DATASET_SQL, self._dataset_params(data))
         dataset_id = cursor.lastrowid
         conn.commit()
         conn.close()
         return dataset_id
 
-    def create_it_ticket(self, data: Dict[str, Any]) -> int:
+    def bulk_create_datasets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert many datasets in one transaction and return how many were added.
+
+        Records are consumed lazily, so a generator streams into the insert.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO it_tickets 
-            (title, description, status, assigned_to, current_stage, priority, created_at, resolved_at, time_in_stage_hours, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        try:
+            with conn:
+                cursor = conn.executemany(self.INSERT_DATASET_SQL, (self._dataset_params(data) for data in records))
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    INSERT_TICKET_SQL = '''
+        INSERT INTO it_tickets 
+        (title, description, status, assigned_to, current_stage, priority, created_at, resolved_at, time_in_stage_hours, category)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def _ticket_params(self, data: Dict[str, Any]) -> tuple:
+        return (
             data['title'], data['description'], data['status'], data['assigned_to'],
             data['current_stage'], data.get('priority', 'Medium'), data['created_at'],
             data.get('resolved_at'), data.get('time_in_stage_hours'), data.get('category')
-        ))
+        )
+
+    def create_it_ticket(self, data: Dict[str, Any]) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(self.INSERT_TICKET_SQL, self._ticket_params(data))
         ticket_id = cursor.lastrowid
         conn.commit()
         conn.close()
         return ticket_id
 
+    def bulk_create_it_tickets(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert many IT tickets in one transaction and return how many were added."""
+        conn = self.get_connection()
+        try:
+            with conn:
+                cursor = conn.executemany(self.INSERT_TICKET_SQL, (self._ticket_params(data) for data in records))
+            return cursor.rowcount
+        finally:
+            conn.close()
+
     def update_ticket_status(self, ticket_id: int, status: str, current_stage: str) -> bool:
         """Update the status and stage of an IT ticket."""
         conn = self.get_connection()
@@ -301,6 +445,149 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def _top_counts(self, cursor, table_name: str, column: str, limit: int = 3) -> List[tuple]:
+        """Get the most common values of a column with their counts."""
+        cursor.execute(f'''
+            SELECT COALESCE({column}, 'Unknown') AS value, COUNT(*) AS n
+            FROM {table_name} GROUP BY value ORDER BY n DESC LIMIT ?
+        ''', (limit,))
+        return cursor.fetchall()
+
+    def cyber_summary(self) -> Dict[str, Any]:
+        """Get incident counts, top threat types and the most recent incidents."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), COALESCE(SUM(status = 'Open'), 0), COALESCE(SUM(severity = 'Critical'), 0)
+                FROM cyber_incidents
+            ''')
+            total, open_count, critical_count = cursor.fetchone()
+            top_threats = self._top_counts(cursor, 'cyber_incidents', 'threat_type')
+            cursor.execute("SELECT title, severity, status FROM cyber_incidents ORDER BY created_at DESC LIMIT 5")
+            recent = [{'title': row[0], 'severity': row[1], 'status': row[2]} for row in cursor.fetchall()]
+            return {
+                'total': total, 'open_count': open_count, 'critical_count': critical_count,
+                'top_threats': top_threats, 'recent': recent
+            }
+        finally:
+            conn.close()
+
+    def get_incident_aggregates(self) -> Dict[str, Any]:
+        """Get the grouped incident counts behind the cybersecurity metrics and charts."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), AVG(resolution_time_hours) FROM cyber_incidents")
+            total_count, avg_resolution_hours = cursor.fetchone()
+            cursor.execute('''
+                SELECT threat_type, severity, COUNT(*) FROM cyber_incidents
+                GROUP BY threat_type, severity
+            ''')
+            threat_severity_crosstab = cursor.fetchall()
+            # Threat and severity totals are the crosstab's marginals, so they need no GROUP BY of their own
+            threat_totals, severity_totals = Counter(), Counter()
+            for threat_type, severity, count in threat_severity_crosstab:
+                threat_totals[threat_type] += count
+                severity_totals[severity] += count
+            threat_counts = threat_totals.most_common()
+            severity_counts = severity_totals.most_common()
+            status_counts = self._top_counts(cursor, 'cyber_incidents', 'status', limit=-1)
+            # Open and critical totals come from the grouped counts rather than another scan
+            open_count = dict(status_counts).get('Open', 0)
+            critical_count = severity_totals['Critical']
+            cursor.execute('''
+                SELECT DATE(created_at) AS day, status, COUNT(*) FROM cyber_incidents
+                WHERE day IS NOT NULL GROUP BY day, status ORDER BY day
+            ''')
+            daily_status_counts = cursor.fetchall()
+            return {
+                'total_count': total_count, 'open_count': open_count, 'critical_count': critical_count,
+                'avg_resolution_hours': avg_resolution_hours or 0,
+                'threat_counts': threat_counts, 'severity_counts': severity_counts, 'status_counts': status_counts,
+                'threat_severity_crosstab': threat_severity_crosstab, 'daily_status_counts': daily_status_counts
+            }
+        finally:
+            conn.close()
+
+    def dataset_summary(self) -> Dict[str, Any]:
+        """Get dataset totals, top departments and the most recent datasets."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), AVG(NULLIF(quality_score, 0)), COALESCE(SUM(size_mb), 0)
+                FROM datasets_metadata
+            ''')
+            total, avg_quality, total_size = cursor.fetchone()
+            top_departments = self._top_counts(cursor, 'datasets_metadata', 'source_department')
+            cursor.execute("SELECT name, quality_score FROM datasets_metadata ORDER BY created_at DESC LIMIT 5")
+            recent = [{'name': row[0], 'quality_score': row[1]} for row in cursor.fetchall()]
+            return {
+                'total': total, 'avg_quality': avg_quality, 'total_size': total_size,
+                'top_departments': top_departments, 'recent': recent
+            }
+        finally:
+            conn.close()
+
+    def get_department_aggregates(self) -> List[Dict[str, Any]]:
+        """Get total size, total rows and average quality score per source department."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT source_department, SUM(size_mb), SUM(row_count), AVG(quality_score)
+                FROM datasets_metadata GROUP BY source_department ORDER BY source_department
+            ''')
+            return [{
+                'source_department': row[0], 'size_mb': row[1], 'row_count': row[2], 'quality_score': row[3]
+            } for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def get_distinct_departments(self) -> List[str]:
+        """Get the sorted distinct source departments of all datasets."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT source_department FROM datasets_metadata
+                WHERE source_department IS NOT NULL AND source_department != ''
+                ORDER BY source_department
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def ticket_summary(self) -> Dict[str, Any]:
+        """Get ticket counts, top priorities and categories, and the most recent tickets."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(status = 'Open'), 0) FROM it_tickets")
+            total, open_count = cursor.fetchone()
+            top_priorities = self._top_counts(cursor, 'it_tickets', 'priority')
+            top_categories = self._top_counts(cursor, 'it_tickets', 'category')
+            cursor.execute("SELECT title, priority, status FROM it_tickets ORDER BY created_at DESC LIMIT 5")
+            recent = [{'title': row[0], 'priority': row[1], 'status': row[2]} for row in cursor.fetchall()]
+            return {
+                'total': total, 'open_count': open_count, 'top_priorities': top_priorities,
+                'top_categories': top_categories, 'recent': recent
+            }
+        finally:
+            conn.close()
+
+    def get_table_version(self, table_name: str) -> int:
+        """Get the write counter for a table, which changes whenever its rows do."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM table_versions WHERE table_name = ?", (table_name,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get platform statistics."""
         conn = self.get_connection()
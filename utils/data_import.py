@@ -4,7 +4,7 @@ Data import utilities for CSV file uploads.
 
 import pandas as pd
 import streamlit as st
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 
 def validate_cyber_incident_row(row: Dict[str, Any]) -> tuple[bool, Optional[str]]:
@@ -63,47 +63,80 @@ def validate_it_ticket_row(row: Dict[str, Any]) -> tuple[bool, Optional[str]]:
     
     return True, None
 
-def parse_csv_file(uploaded_file, data_type: str) -> tuple[bool, Optional[pd.DataFrame], Optional[str]]:
+ROW_VALIDATORS = {
+    'cyber_incidents': validate_cyber_incident_row,
+    'datasets': validate_dataset_row,
+    'it_tickets': validate_it_ticket_row
+}
+
+CSV_CHUNK_ROWS = 10000
+
+def _row_errors(df: pd.DataFrame, data_type: str) -> List[str]:
+    """Validate each row of a frame, numbering rows as they appear in the file."""
+    validator = ROW_VALIDATORS.get(data_type)
+    if validator is None:
+        return []
+    
+    errors = []
+    for idx, row in df.iterrows():
+        valid, error = validator(row.to_dict())
+        if not valid:
+            errors.append(f"Row {idx + 2}: {error}")
+    return errors
+
+def preferred_csv_engine() -> str:
+    """Return the pyarrow CSV engine when pyarrow is installed, otherwise the default C engine."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'c'
+    return 'pyarrow'
+
+def parse_csv_file(uploaded_file, data_type: str, dtype: Optional[Dict[str, str]] = None,
+                   engine: str = 'c') -> tuple[bool, Optional[pd.DataFrame], Optional[str]]:
     """Parse and validate CSV file."""
     try:
-        df = pd.read_csv(uploaded_file)
+        df = pd.read_csv(uploaded_file, dtype=dtype, engine=engine)
         
         if df.empty:
             return False, None, "CSV file is empty"
         
         # Validate based on data type
-        if data_type == "cyber_incidents":
-            errors = []
-            for idx, row in df.iterrows():
-                valid, error = validate_cyber_incident_row(row.to_dict())
-                if not valid:
-                    errors.append(f"Row {idx + 2}: {error}")
-            if errors:
-                return False, None, "\n".join(errors[:10])  # Show first 10 errors
-        
-        elif data_type == "datasets":
-            errors = []
-            for idx, row in df.iterrows():
-                valid, error = validate_dataset_row(row.to_dict())
-                if not valid:
-                    errors.append(f"Row {idx + 2}: {error}")
-            if errors:
-                return False, None, "\n".join(errors[:10])
-        
-        elif data_type == "it_tickets":
-            errors = []
-            for idx, row in df.iterrows():
-                valid, error = validate_it_ticket_row(row.to_dict())
-                if not valid:
-                    errors.append(f"Row {idx + 2}: {error}")
-            if errors:
-                return False, None, "\n".join(errors[:10])
+        errors = _row_errors(df, data_type)
+        if errors:
+            return False, None, "\n".join(errors[:10])  # Show first 10 errors
         
         return True, df, None
         
     except Exception as e:
         return False, None, f"Error parsing CSV: {str(e)}"
 
+def iter_csv_chunks(uploaded_file, chunksize: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Read an uploaded CSV from the start in frames of at most chunksize rows."""
+    uploaded_file.seek(0)
+    with pd.read_csv(uploaded_file, chunksize=chunksize) as reader:
+        yield from reader
+
+def validate_csv_chunks(uploaded_file, data_type: str, chunksize: int = CSV_CHUNK_ROWS) -> tuple[bool, int, Optional[str]]:
+    """Validate a CSV chunk by chunk and return its row count, without holding the whole file."""
+    try:
+        row_count = 0
+        errors = []
+        for chunk in iter_csv_chunks(uploaded_file, chunksize):
+            row_count += len(chunk)
+            errors.extend(_row_errors(chunk, data_type))
+            if len(errors) >= 10:
+                break
+        
+        if errors:
+            return False, row_count, "\n".join(errors[:10])  # Show first 10 errors
+        if row_count == 0:
+            return False, 0, "CSV file is empty"
+        return True, row_count, None
+        
+    except Exception as e:
+        return False, 0, f"Error parsing CSV: {str(e)}"
+
 def prepare_cyber_incident_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """Prepare cyber incident data for database insertion."""
     incidents = []
@@ -3,80 +3,88 @@ Search and filtering utilities for dashboards.
 """
 
 import pandas as pd
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp as a naive datetime, or None if it is invalid.
+
+    Stored timestamps never change, so parses are memoised across reruns.
+    """
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        return None
 
 def filter_cyber_incidents(incidents: List[Dict[str, Any]], search_term: str = "", 
                           threat_type: str = "All", severity: str = "All", 
-                          status: str = "All", date_range: Optional[tuple] = None) -> List[Dict[str, Any]]:
-    """Filter cyber incidents based on criteria."""
-    df = pd.DataFrame(incidents)
+                          status: str = "All", date_range: Optional[tuple] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield cyber incidents matching the criteria, in their original order."""
+    search_term = search_term.lower()
+    if not (date_range and len(date_range) == 2):
+        date_range = None
+    
+    for incident in incidents:
+        # Exact-match filters first, they are the cheapest to reject on
+        if threat_type != "All" and incident.get('threat_type') != threat_type:
+            continue
+        if severity != "All" and incident.get('severity') != severity:
+            continue
+        if status != "All" and incident.get('status') != status:
+            continue
+        
+        # Search term filter
+        if search_term and not any(
+            search_term in str(incident.get(field) or '').lower()
+            for field in ('title', 'description', 'threat_type', 'assigned_to')
+        ):
+            continue
+        
+        # Date range filter
+        if date_range:
+            created_at = _parse_timestamp(str(incident.get('created_at')))
+            if created_at is None or not date_range[0] <= created_at <= date_range[1]:
+                continue
+        
+        yield incident
+
+def filter_datasets_df(df: pd.DataFrame, search_term: str = "",
+                      department: str = "All", min_quality: float = 0.0,
+                      max_quality: float = 10.0, sensitivity: str = "All") -> pd.DataFrame:
+    """Filter a datasets DataFrame with a single combined boolean mask."""
     if df.empty:
-        return []
+        return df
     
-    # Search term filter
-    if search_term:
-        mask = (
-            df['title'].str.contains(search_term, case=False, na=False) |
-            df['description'].str.contains(search_term, case=False, na=False) |
-            df['threat_type'].str.contains(search_term, case=False, na=False) |
-            df['assigned_to'].str.contains(search_term, case=False, na=False)
-        )
-        df = df[mask]
-    
-    # Threat type filter
-    if threat_type != "All":
-        df = df[df['threat_type'] == threat_type]
+    # Quality score filter
+    quality = df['quality_score'].to_numpy(dtype=float, na_value=np.nan)
+    mask = (quality >= min_quality) & (quality <= max_quality)
     
-    # Severity filter
-    if severity != "All":
-        df = df[df['severity'] == severity]
+    # Department filter
+    if department != "All":
+        mask &= (df['source_department'] == department).to_numpy()
     
-    # Status filter
-    if status != "All":
-        df = df[df['status'] == status]
+    # Sensitivity filter
+    if sensitivity != "All":
+        mask &= (df['sensitivity'] == sensitivity).to_numpy()
     
-    # Date range filter
-    if date_range and len(date_range) == 2:
-        try:
-            df['created_at'] = pd.to_datetime(df['created_at'], format='ISO8601', errors='coerce')
-            df = df.dropna(subset=['created_at'])
-            start_date, end_date = date_range
-            df = df[(df['created_at'] >= start_date) & (df['created_at'] <= end_date)]
-        except:
-            pass
+    # Search term filter
+    if search_term:
+        mask &= (
+            df['name'].str.contains(search_term, case=False, na=False, regex=False) |
+            df['source_department'].str.contains(search_term, case=False, na=False, regex=False) |
+            df['sensitivity'].str.contains(search_term, case=False, na=False, regex=False)
+        ).to_numpy()
     
-    return df.to_dict('records')
+    return df[mask]
 
 def filter_datasets(datasets: List[Dict[str, Any]], search_term: str = "",
                    department: str = "All", min_quality: float = 0.0,
                    max_quality: float = 10.0, sensitivity: str = "All") -> List[Dict[str, Any]]:
     """Filter datasets based on criteria."""
-    df = pd.DataFrame(datasets)
-    if df.empty:
-        return []
-    
-    # Search term filter
-    if search_term:
-        mask = (
-            df['name'].str.contains(search_term, case=False, na=False) |
-            df['source_department'].str.contains(search_term, case=False, na=False) |
-            df['sensitivity'].str.contains(search_term, case=False, na=False)
-        )
-        df = df[mask]
-    
-    # Department filter
-    if department != "All":
-        df = df[df['source_department'] == department]
-    
-    # Quality score filter
-    if 'quality_score' in df.columns:
-        df = df[(df['quality_score'] >= min_quality) & (df['quality_score'] <= max_quality)]
-    
-    # Sensitivity filter
-    if sensitivity != "All":
-        df = df[df['sensitivity'] == sensitivity]
-    
+    df = filter_datasets_df(pd.DataFrame(datasets), search_term, department, min_quality, max_quality, sensitivity)
     return df.to_dict('records')
 
 def filter_it_tickets(tickets: List[Dict[str, Any]], search_term: str = "",
@@ -5,6 +5,18 @@ Provides consistent styling across all dashboards.
 
 import streamlit as st
 
+METRIC_CARD = "<div class='metric-card'><h3>{label}</h3><h2 style='color: {color};'>{value}</h2></div>"
+
+def render_metric_cards(cards):
+    """
+    Render a row of metric cards with a single st.markdown call.
+    
+    Args:
+        cards: Iterable of (label, value, colour) tuples
+    """
+    html = "".join(METRIC_CARD.format(label=label, value=value, color=color) for label, value, color in cards)
+    st.markdown(f"<div class='metric-row'>{html}</div>", unsafe_allow_html=True)
+
 def apply_modern_theme(dark_mode: bool = True):
     """
     Apply modern theme styling to the Streamlit application.
@@ -100,6 +112,23 @@ def apply_modern_theme(dark_mode: bool = True):
                 color: #e2e8f0 !important;
             }
             
+            /* Row of metric cards rendered as a single block */
+            .metric-row {
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+                gap: 1rem;
+            }
+            
+            /* Native st.metric widgets drawn as metric cards */
+            [data-testid="stMetric"] {
+                background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%) !important;
+                padding: 20px !important;
+                border-radius: 12px !important;
+                border-left: 4px solid #6366f1 !important;
+                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2) !important;
+                color: #e2e8f0 !important;
+            }
+            
             /* Dataframes and tables */
             .dataframe {
                 background-color: #1e293b !important;
@@ -262,6 +291,23 @@ def apply_modern_theme(dark_mode: bool = True):
                 color: #1e293b !important;
             }
             
+            /* Row of metric cards rendered as a single block */
+            .metric-row {
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+                gap: 1rem;
+            }
+            
+            /* Native st.metric widgets drawn as metric cards */
+            [data-testid="stMetric"] {
+                background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%) !important;
+                padding: 20px !important;
+                border-radius: 12px !important;
+                border-left: 4px solid #3b82f6 !important;
+                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05) !important;
+                color: #1e293b !important;
+            }
+            
             /* Dataframes and tables */
             .dataframe {
                 background-color: white !important;